@@ -0,0 +1,257 @@
+import json
+import logging
+import os
+import queue
+import threading
+
+import pygame
+
+from settings import *
+
+logger = logging.getLogger(__name__)
+
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Optional image assets: name -> (filename, use_alpha)
+IMAGE_FILES = {
+    "start_background": ("start_background.png", False),
+    "background": ("background.png", False),
+    "building": ("building.png", True),
+    "bandit": ("bandit.png", True),
+    "civilian": ("civilian.png", True),
+    "dead_bandit": ("dead_bandit.png", True),
+    # "health_pack": ("health_pack.png", True), # Optional: If needed later
+}
+
+# Every (size, flip) variant the game draws of each image
+SPRITE_VARIANTS = {
+    "start_background": [((SCREEN_WIDTH, SCREEN_HEIGHT), False)],
+    "background": [((SCREEN_WIDTH, SCREEN_HEIGHT), False)],
+    "building": [(rect.size, False) for rect in BUILDING_RECTS],
+    "bandit": [((CHARACTER_WIDTH, CHARACTER_HEIGHT), False), ((CHARACTER_WIDTH, CHARACTER_HEIGHT), True)],
+    "civilian": [((CHARACTER_WIDTH, CHARACTER_HEIGHT), False), ((CHARACTER_WIDTH, CHARACTER_HEIGHT), True)],
+    "dead_bandit": [((CHARACTER_WIDTH, CHARACTER_HEIGHT // 2), False)],
+}
+
+# Packed sprite atlas written by build_atlas.py: one image holding every
+# variant in SPRITE_VARIANTS of these sprites, plus a JSON index of where
+# each one is
+ATLAS_IMAGE = "sprites_atlas.png"
+ATLAS_INDEX = "sprites_atlas.json"
+ATLAS_FORMAT_VERSION = 1
+ATLAS_SPRITES = ("bandit", "civilian", "dead_bandit", "building")
+ATLAS = "atlas" # Load job name for the atlas
+
+# --- Asset Loading Helpers ---
+def decode_image(filename):
+    # Safe to call from a worker thread: only reads and decodes the file
+    filepath = os.path.join(ASSET_DIR, filename)
+    try:
+        return pygame.image.load(filepath)
+    except pygame.error as e:
+        logger.warning("Cannot load image: %s - %s", filename, e)
+        return None
+    except FileNotFoundError:
+        logger.info("Image file not found: %s", filename)
+        return None
+
+def prepare_image(image, use_alpha=True):
+    # Must run on the main thread, after the display is set up
+    if use_alpha:
+        return image.convert_alpha() # Optimize for transparency
+    return image.convert() # Optimize for opaque images
+
+def load_image(filename, use_alpha=True):
+    image = decode_image(filename)
+    if image is None:
+        return None
+    logger.info("Successfully loaded image: %s", filename)
+    return prepare_image(image, use_alpha)
+
+def atlas_available():
+    return all(os.path.exists(os.path.join(ASSET_DIR, f)) for f in (ATLAS_IMAGE, ATLAS_INDEX))
+
+def read_atlas_index():
+    with open(os.path.join(ASSET_DIR, ATLAS_INDEX)) as f:
+        index = json.load(f)
+    if index.get("version") != ATLAS_FORMAT_VERSION:
+        logger.warning("Unsupported atlas version %s in %s", index.get("version"), ATLAS_INDEX)
+        return None
+    if not isinstance(index.get("sprites"), list):
+        logger.warning("No sprite list in %s", ATLAS_INDEX)
+        return None
+    return index
+
+def decode_job(job):
+    # Worker-thread half of a load job: the decoded image, or for the atlas
+    # a (decoded image, index) pair. Never raises, so a bad file can't stop
+    # a worker and leave its job pending forever.
+    try:
+        if job == ATLAS:
+            index = read_atlas_index()
+            return (decode_image(ATLAS_IMAGE), index) if index else (None, None)
+        return decode_image(IMAGE_FILES[job][0])
+    except Exception as e:
+        logger.warning("Cannot load %s: %s", ATLAS_INDEX if job == ATLAS else IMAGE_FILES[job][0], e)
+        return (None, None) if job == ATLAS else None
+
+class Assets:
+    # The optional images. They are either decoded by worker threads
+    # (start_loading, then poll once per frame) or loaded on the calling
+    # thread (load_next / load_all). If the sprite atlas exists, the
+    # character and building sprites come from it in a single decode instead
+    # of one file each; any it can't provide are then loaded from their own
+    # files. Until an image arrives (or if it is missing) get()
+    # returns None and the game draws its colored-rect fallback. version goes
+    # up whenever an image arrives, so anything built from the images knows
+    # to rebuild.
+    def __init__(self, use_atlas=USE_SPRITE_ATLAS):
+        self.images = dict.fromkeys(IMAGE_FILES)
+        # Load jobs in order, start screen first: image names, or ATLAS
+        if use_atlas and atlas_available():
+            self.jobs = [name for name in IMAGE_FILES if name not in ATLAS_SPRITES] + [ATLAS]
+        else:
+            self.jobs = list(IMAGE_FILES)
+        self.pending = list(self.jobs)
+        self.threaded = False # Set by start_loading
+        self.version = 0
+        self.requests = queue.SimpleQueue() # Jobs for the worker threads to decode
+        self.results = queue.SimpleQueue() # (job, decode_job result) from the workers
+        # Scaled (and optionally flipped) copies of the loaded images, keyed
+        # by (source image, target size, flip), or atlas subsurfaces. Each variant is built once
+        # and reused, so drawing only needs to blit.
+        self.sprite_cache = {}
+
+    @property
+    def loaded(self):
+        return not self.pending
+
+    @property
+    def progress(self):
+        # (load jobs finished, load jobs total), whether found or not
+        return len(self.jobs) - len(self.pending), len(self.jobs)
+
+    def get(self, name):
+        return self.images[name]
+
+    def add_image(self, name, image):
+        self.images[name] = image
+        if image:
+            # Build every variant the game draws up front so drawing doesn't stall
+            for size, flip in SPRITE_VARIANTS.get(name, ()):
+                self.get_sprite(image, size, flip)
+            self.version += 1
+
+    def add_atlas(self, atlas, index):
+        # Every atlas entry becomes a subsurface of the one atlas image and
+        # goes straight into the sprite cache, so nothing is scaled at runtime.
+        # The first unflipped entry of a sprite stands in as its source image.
+        # A sprite missing any variant in SPRITE_VARIANTS (the atlas predates
+        # a size change) is skipped, so it gets loaded from its own file.
+        # A malformed index raises before anything is installed.
+        sprites = []
+        variants = {name: set() for name in ATLAS_SPRITES}
+        for entry in index["sprites"]:
+            if entry["name"] not in ATLAS_SPRITES:
+                raise ValueError(f"unknown sprite {entry['name']!r}")
+            size = tuple(entry["size"])
+            flip = bool(entry["flip"])
+            sprites.append((entry["name"], size, flip, atlas.subsurface(entry["rect"])))
+            variants[entry["name"]].add((size, flip))
+        stale = [name for name in ATLAS_SPRITES if not set(SPRITE_VARIANTS[name]) <= variants[name]]
+        if stale:
+            logger.warning("Sprite atlas %s is stale for %s; rerun build_atlas.py", ATLAS_INDEX, ", ".join(stale))
+            sprites = [sprite for sprite in sprites if sprite[0] not in stale]
+        for name, size, flip, sprite in sprites:
+            if self.images[name] is None and not flip:
+                self.images[name] = sprite
+        for name, size, flip, sprite in sprites:
+            source = self.images[name]
+            if source is not None:
+                self.sprite_cache[(source, size, flip)] = sprite
+        self.version += 1
+
+    def queue_jobs(self, jobs):
+        # Add load jobs after loading has started
+        self.jobs += jobs
+        self.pending += jobs
+        if self.threaded:
+            for job in jobs:
+                self.requests.put(job)
+            threading.Thread(target=self._decode_worker, name="asset-loader-fallback", daemon=True).start()
+
+    def install(self, job, decoded):
+        # Main-thread half of a load job
+        if job == ATLAS:
+            atlas, index = decoded
+            if atlas is not None:
+                try:
+                    self.add_atlas(prepare_image(atlas), index)
+                    logger.info("Successfully loaded sprite atlas: %s", ATLAS_IMAGE)
+                except (KeyError, TypeError, ValueError, pygame.error) as e:
+                    logger.warning("Cannot use sprite atlas %s: %s", ATLAS_INDEX, e)
+            # Load whatever the atlas didn't provide from the individual files
+            missing = [name for name in ATLAS_SPRITES if self.images[name] is None]
+            if missing:
+                self.queue_jobs(missing)
+            return
+        filename, use_alpha = IMAGE_FILES[job]
+        if decoded is not None:
+            logger.info("Successfully loaded image: %s", filename)
+            decoded = prepare_image(decoded, use_alpha)
+        self.add_image(job, decoded)
+
+    def load_next(self):
+        # Run one pending load job on this thread. Returns False once
+        # everything is loaded.
+        if not self.pending:
+            return False
+        job = self.pending.pop(0)
+        self.install(job, decode_job(job))
+        return True
+
+    def load_all(self):
+        while self.load_next():
+            pass
+
+    def start_loading(self, workers=ASSET_LOADER_THREADS):
+        # Decode every pending image in parallel worker threads. The threads
+        # exit once the queue is drained.
+        self.threaded = True
+        for name in self.pending:
+            self.requests.put(name)
+        for i in range(min(workers, len(self.pending))):
+            threading.Thread(target=self._decode_worker, name=f"asset-loader-{i}", daemon=True).start()
+
+    def _decode_worker(self):
+        while True:
+            try:
+                job = self.requests.get_nowait()
+            except queue.Empty:
+                return
+            self.results.put((job, decode_job(job)))
+
+    def poll(self):
+        # Call once per frame on the main thread: converts and installs the
+        # images whose decode has finished. Returns True if any arrived.
+        arrived = False
+        while True:
+            try:
+                job, decoded = self.results.get_nowait()
+            except queue.Empty:
+                return arrived
+            if job not in self.pending:
+                continue # Already loaded synchronously
+            self.pending.remove(job)
+            self.install(job, decoded)
+            arrived = True
+
+    def get_sprite(self, image, size, flip=False):
+        key = (image, tuple(size), flip)
+        sprite = self.sprite_cache.get(key)
+        if sprite is None:
+            sprite = pygame.transform.scale(image, key[1])
+            if flip:
+                sprite = pygame.transform.flip(sprite, True, False) # Flip horizontally
+            self.sprite_cache[key] = sprite
+        return sprite
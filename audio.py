@@ -0,0 +1,117 @@
+import logging
+import os
+import threading
+
+import pygame
+
+from assets import ASSET_DIR
+from settings import *
+
+logger = logging.getLogger(__name__)
+
+# Optional sound effects: name -> filename. Short WAV/OGG clips work best.
+SOUND_FILES = {
+    "shot": "shot.wav",
+    "hit": "hit.wav",
+    "health_pack": "health_pack.wav",
+    "ammo": "ammo.wav",
+    "empty_click": "empty_click.wav",
+    "player_hit": "player_hit.wav",
+    "game_over": "game_over.wav",
+}
+
+# Simulation event -> sound effect
+EVENT_SOUNDS = {
+    "shot": "shot",
+    "bandit_hit": "hit",
+    "civilian_hit": "hit",
+    "collect_health": "health_pack",
+    "collect_ammo": "ammo",
+    "empty_click": "empty_click",
+    "player_hit": "player_hit",
+}
+
+def decode_sound(filename):
+    # Decodes the whole clip into memory. Needs the mixer, safe from any thread.
+    filepath = os.path.join(ASSET_DIR, filename)
+    try:
+        return pygame.mixer.Sound(filepath)
+    except FileNotFoundError:
+        logger.info("Sound file not found: %s", filename)
+        return None
+    except pygame.error as e:
+        logger.warning("Cannot load sound: %s - %s", filename, e)
+        return None
+
+class AudioManager:
+    # Sound effects and background music. start() opens the mixer with a
+    # small buffer (MIXER_BUFFER) for low click-to-sound latency. A
+    # background thread then decodes every effect into memory and opens the
+    # music stream, so the game loop never waits on audio files. Effects
+    # that haven't loaded (or don't exist) are skipped silently.
+    def __init__(self, sfx_enabled=SFX_ENABLED, music_enabled=MUSIC_ENABLED):
+        self.sfx_enabled = sfx_enabled
+        self.music_enabled = music_enabled
+        self.sounds = {} # name -> pygame.mixer.Sound, filled in by the loader thread
+        self.loader = None
+
+    @property
+    def enabled(self):
+        return self.sfx_enabled or self.music_enabled
+
+    def start(self):
+        # The mixer is only started when there is something to play
+        if not self.enabled:
+            return
+        try:
+            pygame.mixer.init(MIXER_FREQUENCY, -16, 2, MIXER_BUFFER)
+        except pygame.error as e:
+            logger.warning("Cannot start the audio mixer: %s. Running without sound.", e)
+            return
+        # Effects only play on this fixed pool of channels; the music stream
+        # doesn't use one
+        pygame.mixer.set_num_channels(SFX_CHANNELS)
+        self.loader = threading.Thread(target=self._load, name="audio-loader", daemon=True)
+        self.loader.start()
+
+    def _load(self):
+        if self.sfx_enabled:
+            for name, filename in SOUND_FILES.items():
+                sound = decode_sound(filename)
+                if sound is not None:
+                    sound.set_volume(SFX_VOLUME)
+                    self.sounds[name] = sound
+            logger.info("Loaded %d/%d sound effects", len(self.sounds), len(SOUND_FILES))
+        if self.music_enabled:
+            self.start_music()
+
+    def start_music(self):
+        try:
+            music_path = os.path.join(ASSET_DIR, MUSIC_FILE)
+            pygame.mixer.music.load(music_path)
+            pygame.mixer.music.play(loops=-1) # Play indefinitely
+            logger.info("Successfully loaded and playing %s", MUSIC_FILE)
+        except FileNotFoundError:
+            logger.info("Background music file '%s' not found. Skipping music.", MUSIC_FILE)
+        except pygame.error as e:
+            logger.warning("Cannot load background music '%s': %s. Skipping music.", MUSIC_FILE, e)
+
+    def play(self, name):
+        sound = self.sounds.get(name)
+        if sound is None:
+            return
+        # With every channel busy, force=True steals the one that has been
+        # playing longest
+        channel = pygame.mixer.find_channel(True)
+        channel.play(sound)
+
+    def play_events(self, events):
+        for event in events:
+            sound_name = EVENT_SOUNDS.get(event)
+            if sound_name:
+                self.play(sound_name)
+
+    def stop(self):
+        if pygame.mixer.get_init():
+            pygame.mixer.music.stop() # Stop music before quitting
+            pygame.mixer.stop()
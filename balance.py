@@ -0,0 +1,178 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1") # Workers inherit it, so pygame's banner prints once at most
+
+import settings
+from settings import MAX_TOTAL_HEALTH, SIM_STEP_MS, GAME_OVER_SHOT, GAME_OVER_CIVILIAN, GAME_OVER_OUT_OF_AMMO
+from simulation import Simulation, TUNABLE_SETTINGS
+
+# Monte-Carlo balance simulator: plays many headless rounds with a scripted
+# bot for every point of a parameter grid, spread over all cores, and
+# reports how long the bot survived, the level it reached and why each
+# round ended. For example:
+#
+#     python balance.py --runs 500 --accuracy 0.85 --reaction 350 \
+#         --grid KILLS_PER_LEVEL=3,5,8 --grid HEALTH_PACK_DROP_CHANCE=0.1,0.2,0.3
+
+# Settings a grid may vary; each round passes them to its Simulation
+TUNABLE = TUNABLE_SETTINGS
+DEFAULTS = {name: getattr(settings, name) for name in TUNABLE}
+TIMEOUT = "timeout" # The round outlived max_minutes
+REASONS = (GAME_OVER_SHOT, GAME_OVER_CIVILIAN, GAME_OVER_OUT_OF_AMMO, TIMEOUT)
+
+class BotShooter:
+    # Plays like a player with a given accuracy (chance that a shot lands
+    # where it was aimed) and reaction time (ms before it acts on something
+    # new). It picks up health when hurt, picks up ammo when it has none
+    # left, and otherwise shoots the bandit that has been up the longest.
+    # It acts at most once per reaction time. A miss lands up to miss_radius
+    # px outside the target; with hold_fire, the bot doesn't shoot at a
+    # bandit while a civilian is within that area.
+    def __init__(self, accuracy, reaction_ms, rng, miss_radius=120, hold_fire=True):
+        self.accuracy = accuracy
+        self.reaction_ms = reaction_ms
+        self.rng = rng
+        self.miss_radius = miss_radius
+        self.hold_fire = hold_fire
+        self.next_action_time = 0
+
+    def miss_area(self, rect):
+        return rect.inflate(2 * self.miss_radius, 2 * self.miss_radius)
+
+    def aim(self, rect):
+        if self.rng.random() < self.accuracy or self.miss_radius <= 0:
+            return rect.center
+        # A miss lands somewhere around the target, never on it
+        area = self.miss_area(rect)
+        while True:
+            pos = (self.rng.randrange(area.left, area.right), self.rng.randrange(area.top, area.bottom))
+            if not rect.collidepoint(pos):
+                return pos
+
+    def is_clear(self, sim, bandit):
+        # No civilian where a miss at this bandit could land
+        if not self.hold_fire:
+            return True
+        area = self.miss_area(bandit.rect)
+        return not any(area.colliderect(civilian.rect) for civilian in sim.civilians)
+
+    def choose_clicks(self, sim):
+        now = sim.clock.now
+        if now < self.next_action_time:
+            return []
+        seen_by = now - self.reaction_ms # Only things that appeared before this are noticed
+        target = None
+        if sim.player_health < MAX_TOTAL_HEALTH:
+            target = next((pack for pack in sim.health_packs if pack.spawn_time <= seen_by), None)
+        if target is None and sim.ammo <= 0:
+            target = next((dead for dead in sim.dead_bandits if dead.death_time <= seen_by), None)
+        if target is None and sim.ammo > 0:
+            target = next((bandit for bandit in sim.bandits
+                           if bandit.spawn_time <= seen_by and self.is_clear(sim, bandit)), None)
+        if target is None:
+            return []
+        self.next_action_time = now + self.reaction_ms
+        return [self.aim(target.rect)]
+
+def play_round(params, bot_settings, seed, max_minutes):
+    # bot_settings: BotShooter keyword arguments besides rng
+    sim = Simulation(seed, tuning=params)
+    bot = BotShooter(rng=random.Random(seed ^ 0x5EED), **bot_settings)
+    max_steps = int(max_minutes * 60000 / SIM_STEP_MS)
+    for _ in range(max_steps):
+        sim.step(SIM_STEP_MS, bot.choose_clicks(sim))
+        if sim.game_over:
+            break
+    return {
+        "survival_s": sim.clock.now / 1000,
+        "level": sim.level + 1,
+        "kills": sim.bandits_killed,
+        "score": sim.score,
+        "reason": sim.game_over_reason or TIMEOUT,
+    }
+
+def play_batch(task):
+    # Worker entry point: one grid point, a range of seeds
+    params, bot_settings, seeds, max_minutes = task
+    return params, [play_round(params, bot_settings, seed, max_minutes) for seed in seeds]
+
+def summarize(params, rounds):
+    survival = [r["survival_s"] for r in rounds]
+    levels = [r["level"] for r in rounds]
+    return {
+        "params": params,
+        "runs": len(rounds),
+        "survival_s": {"mean": statistics.mean(survival), "median": statistics.median(survival),
+                       "p10": statistics.quantiles(survival, n=10)[0] if len(survival) > 1 else survival[0]},
+        "level": {"mean": statistics.mean(levels), "max": max(levels)},
+        "kills_mean": statistics.mean(r["kills"] for r in rounds),
+        "game_over": {reason: sum(r["reason"] == reason for r in rounds) / len(rounds) for reason in REASONS},
+    }
+
+def parse_grid(specs):
+    # ["NAME=1,2,3", ...] -> list of {NAME: value} dicts, one per grid point
+    axes = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in TUNABLE:
+            raise SystemExit(f"Cannot tune {name}; choose from {', '.join(TUNABLE)}")
+        cast = type(DEFAULTS[name])
+        axes[name] = [cast(value) for value in values.split(",")]
+    return [dict(zip(axes, combo)) for combo in itertools.product(*axes.values())]
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless bot rounds over a grid of balance settings.")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2", help=f"vary a setting ({', '.join(TUNABLE)})")
+    parser.add_argument("--runs", type=int, default=200, help="rounds per grid point")
+    parser.add_argument("--accuracy", type=float, default=0.8, help="chance a bot shot lands where it aims")
+    parser.add_argument("--reaction", type=float, default=400, help="bot reaction time in ms")
+    parser.add_argument("--miss-radius", type=int, default=120, help="how far outside its target a missed bot shot may land, in px")
+    parser.add_argument("--no-hold-fire", dest="hold_fire", action="store_false",
+                        help="let the bot shoot at bandits with a civilian within its miss radius")
+    parser.add_argument("--max-minutes", type=float, default=10, help="end a round as a timeout after this much game time")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="first seed; rounds use consecutive seeds")
+    parser.add_argument("--output", default="balance_results.json")
+    args = parser.parse_args()
+
+    grid = parse_grid(args.grid)
+    bot_settings = {"accuracy": args.accuracy, "reaction_ms": args.reaction,
+                    "miss_radius": args.miss_radius, "hold_fire": args.hold_fire}
+    batch = max(1, args.runs // (args.workers * 4)) # Enough batches to keep every worker busy
+    tasks = []
+    for params in grid:
+        for first in range(0, args.runs, batch):
+            seeds = range(args.seed + first, args.seed + min(first + batch, args.runs))
+            tasks.append((params, bot_settings, seeds, args.max_minutes))
+
+    start = time.perf_counter()
+    rounds = {}
+    with ProcessPoolExecutor(args.workers) as pool:
+        for params, results in pool.map(play_batch, tasks):
+            rounds.setdefault(tuple(params.items()), []).extend(results)
+    elapsed = time.perf_counter() - start
+
+    summaries = [summarize(dict(key), results) for key, results in rounds.items()]
+    total = len(grid) * args.runs
+    print(f"{total} rounds in {elapsed:.1f} s ({total / elapsed:.0f} rounds/s, {args.workers} workers)")
+    for summary in summaries:
+        reasons = ", ".join(f"{reason} {share:.0%}" for reason, share in summary["game_over"].items())
+        print(f"{summary['params'] or 'defaults'}: survival {summary['survival_s']['mean']:.1f} s, "
+              f"level {summary['level']['mean']:.1f} (max {summary['level']['max']}), {reasons}")
+
+    with open(args.output, "w") as f:
+        json.dump({"bot": bot_settings,
+                   "max_minutes": args.max_minutes, "results": summaries}, f, indent=2)
+    print(f"Wrote {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
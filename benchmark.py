@@ -0,0 +1,193 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # No real window needed
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import pygame
+
+from assets import Assets
+from profiler import FrameProfiler
+from render import Renderer
+from settings import *
+from simulation import (Simulation, Bandit, Civilian, DeadBandit, HealthPack, ShotEffect,
+                        LAYER_BANDIT, LAYER_CIVILIAN, LAYER_DEAD_BANDIT, LAYER_HEALTH_PACK)
+from textcache import TextCache
+
+# Drives the simulation update and the renderer under SDL's dummy video
+# driver with fixed entity counts, well past the normal on-screen limits,
+# and writes frames/second, per-phase times, retained memory and garbage
+# collections to JSON:
+#
+#     python benchmark.py --output new.json --compare old.json
+
+# name -> (bandits, civilians, dead bandits, health packs, shot effects)
+SCENARIOS = {
+    "normal": (4, 1, 2, 1, 2),
+    "busy": (20, 10, 10, 5, 10),
+    "showdown": (100, 40, 60, 20, 50),
+    "stress": (400, 150, 200, 80, 200),
+}
+
+FOREVER = float("inf")
+
+def top_up(sim, counts, rng):
+    # Bring each entity list back to its target count. Benchmark entities
+    # never expire and the player can't die or run dry, so the counts stay
+    # put apart from kills, pickups and civilians walking off screen.
+    # Refills go through the pool, like the game's own spawns.
+    now = sim.clock.now
+    bandits, civilians, dead_bandits, health_packs, shot_effects = counts
+    while len(sim.bandits) < bandits:
+        bandit = sim.pool.acquire(Bandit, rng.randint(0, SCREEN_WIDTH - CHARACTER_WIDTH), rng.randint(SCREEN_HEIGHT // 3, SCREEN_HEIGHT - CHARACTER_HEIGHT - 50), now, sim.rng)
+        bandit.expire_time = FOREVER
+        sim.add_entity(sim.bandits, bandit, LAYER_BANDIT)
+    while len(sim.civilians) < civilians:
+        civilian = sim.pool.acquire(Civilian, now, sim.rng)
+        civilian.rect.x = rng.randint(0, SCREEN_WIDTH - CHARACTER_WIDTH)
+        sim.add_entity(sim.civilians, civilian, LAYER_CIVILIAN)
+    while len(sim.dead_bandits) < dead_bandits:
+        dead_bandit = sim.pool.acquire(DeadBandit, rng.randint(0, SCREEN_WIDTH - CHARACTER_WIDTH), rng.randint(SCREEN_HEIGHT // 2, SCREEN_HEIGHT - CHARACTER_HEIGHT // 2), now)
+        dead_bandit.expire_time = FOREVER
+        sim.add_entity(sim.dead_bandits, dead_bandit, LAYER_DEAD_BANDIT)
+    while len(sim.health_packs) < health_packs:
+        pack = sim.pool.acquire(HealthPack, rng.randint(0, SCREEN_WIDTH - CHARACTER_WIDTH), rng.randint(SCREEN_HEIGHT // 2, SCREEN_HEIGHT - CHARACTER_HEIGHT), now)
+        pack.expire_time = FOREVER
+        sim.add_entity(sim.health_packs, pack, LAYER_HEALTH_PACK)
+    while len(sim.player_shot_effects) + len(sim.bandit_shot_effects) < shot_effects:
+        effect = sim.pool.acquire(ShotEffect, PLAYER_POSITION, (rng.randint(0, SCREEN_WIDTH), rng.randint(0, SCREEN_HEIGHT)), PLAYER_SHOT_COLOR, now)
+        effect.expire_time = FOREVER
+        sim.add_effect(sim.player_shot_effects, effect)
+    sim.player_health = sim.ammo = 10 ** 9
+
+def make_sim(counts, seed, profiler):
+    sim = Simulation(seed, profiler=profiler)
+    top_up(sim, counts, random.Random(seed))
+    return sim
+
+def run_frames(sim, renderer, counts, frames, rng, click_every=10):
+    # One frame: a simulation step (with a click every click_every frames)
+    # and a full draw + present. top_up runs outside the timed profiler
+    # phases.
+    profiler = sim.profiler
+    for frame in range(frames):
+        mouse_pos = (rng.randrange(SCREEN_WIDTH), rng.randrange(SCREEN_HEIGHT))
+        clicks = [mouse_pos] if frame % click_every == 0 else []
+        profiler.start_frame()
+        sim.step(SIM_STEP_MS, clicks)
+        renderer.draw(PLAYING, sim, mouse_pos)
+        profiler.end_frame()
+        pygame.event.pump()
+        top_up(sim, counts, rng)
+
+def gc_collections():
+    # Garbage collections run so far, all generations
+    return sum(gen["collections"] for gen in gc.get_stats())
+
+def measure_allocations(sim, renderer, counts, frames, rng):
+    # Python memory retained per frame, traced separately from the timed
+    # run. Snapshot diffs only see blocks still alive at the end, so
+    # short-lived allocations show up in gc_collections_per_frame instead.
+    tracemalloc.start()
+    run_frames(sim, renderer, counts, 1, rng) # Warm caches before the baseline
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    run_frames(sim, renderer, counts, frames, rng)
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    return {
+        "net_retained_blocks_per_frame": sum(max(stat.count_diff, 0) for stat in stats) / frames,
+        "net_bytes_per_frame": sum(stat.size_diff for stat in stats) / frames,
+        "peak_traced_bytes": peak,
+    }
+
+def run_scenario(name, counts, with_images, frames, screen, seed):
+    assets = Assets()
+    if with_images:
+        assets.load_all()
+    else:
+        assets.pending.clear() # Nothing loads; every sprite uses its colored-rect fallback
+    # Never refreshing the summary keeps the profiler overlay off screen
+    profiler = FrameProfiler(enabled=True, window=frames, trace_frames=frames, refresh_frames=sys.maxsize)
+    renderer = Renderer(screen, assets, TextCache(TEXT_CACHE_SIZE), profiler)
+    sim = make_sim(counts, seed, profiler)
+    rng = random.Random(seed)
+
+    run_frames(sim, renderer, counts, min(30, frames), rng) # Warm up caches
+    profiler.history.clear()
+    collections = gc_collections()
+    start = time.perf_counter()
+    run_frames(sim, renderer, counts, frames, rng)
+    elapsed = time.perf_counter() - start
+    collections = gc_collections() - collections
+
+    allocations = measure_allocations(sim, renderer, counts, min(60, frames), rng)
+    allocations["gc_collections_per_frame"] = collections / frames
+    return {
+        "scenario": name,
+        "images": with_images,
+        "entities": dict(zip(("bandits", "civilians", "dead_bandits", "health_packs", "shot_effects"), counts)),
+        "frames": frames,
+        "fps": frames / elapsed,
+        "phases_ms": {phase: {"p50": p50, "p99": p99} for phase, (p50, p99) in profiler.percentiles().items()},
+        "allocations": allocations,
+    }
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r["scenario"], r["images"]): r for r in json.load(f)["results"]}
+    print(f"\nCompared to {baseline_path}:")
+    for result in results:
+        old = baseline.get((result["scenario"], result["images"]))
+        if old:
+            change = (result["fps"] / old["fps"] - 1) * 100
+            print(f"  {result['scenario']:<10} images={str(result['images']):<5} {old['fps']:8.1f} -> {result['fps']:8.1f} fps ({change:+.1f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game loop under synthetic entity loads.")
+    parser.add_argument("--frames", type=int, default=300, help="timed frames per scenario")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="run only these scenarios (repeatable)")
+    parser.add_argument("--images", choices=("both", "on", "off"), default="both", help="draw with image assets, fallbacks, or both")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write the JSON results")
+    parser.add_argument("--compare", metavar="FILE", help="earlier results to compare frames/second against")
+    args = parser.parse_args()
+
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    image_modes = {"both": (True, False), "on": (True,), "off": (False,)}[args.images]
+
+    results = []
+    for name in args.scenario or SCENARIOS:
+        for with_images in image_modes:
+            result = run_scenario(name, SCENARIOS[name], with_images, args.frames, screen, args.seed)
+            results.append(result)
+            allocations = result["allocations"]
+            print(f"{name:<10} images={str(with_images):<5} {result['fps']:8.1f} fps  "
+                  f"{allocations['net_retained_blocks_per_frame']:8.1f} retained blocks/frame  "
+                  f"{allocations['gc_collections_per_frame']:6.3f} collections/frame")
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=2)
+    print(f"Wrote {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+    pygame.quit()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+import json
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # No window needed
+import pygame
+
+from assets import (ASSET_DIR, ATLAS_FORMAT_VERSION, ATLAS_IMAGE, ATLAS_INDEX,
+                    ATLAS_SPRITES, IMAGE_FILES, SPRITE_VARIANTS, decode_image)
+
+# Offline tool: packs every variant the game draws of the character and
+# building sprites (already scaled, flipped ones included) into one atlas
+# image plus a JSON index. Run it again after changing a sprite or a size:
+#
+#     python build_atlas.py
+
+ATLAS_MAX_WIDTH = 1024
+PADDING = 1 # px between sprites so filtering never bleeds across
+
+def pack_shelves(sizes, max_width):
+    # Simple shelf packing: tallest first, left to right, new row when full.
+    # Returns the (x, y) of each size, in input order, and the atlas size.
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i][1], reverse=True)
+    positions = [None] * len(sizes)
+    x = y = shelf_height = width = 0
+    for i in order:
+        w, h = sizes[i]
+        if x + w > max_width:
+            x, y = 0, y + shelf_height + PADDING
+            shelf_height = 0
+        positions[i] = (x, y)
+        x += w + PADDING
+        shelf_height = max(shelf_height, h)
+        width = max(width, x - PADDING)
+    return positions, (width, y + shelf_height)
+
+def build_atlas():
+    pygame.display.init()
+    sprites = [] # (name, size, flip, surface)
+    for name in ATLAS_SPRITES:
+        source = decode_image(IMAGE_FILES[name][0])
+        if source is None:
+            print(f"Skipping {name}: no source image")
+            continue
+        for size, flip in dict.fromkeys(SPRITE_VARIANTS[name]): # Drop duplicate variants
+            sprite = pygame.transform.scale(source, size)
+            if flip:
+                sprite = pygame.transform.flip(sprite, True, False)
+            sprites.append((name, size, flip, sprite))
+    if not sprites:
+        print("No sprites to pack")
+        return False
+
+    positions, atlas_size = pack_shelves([sprite[1] for sprite in sprites], ATLAS_MAX_WIDTH)
+    atlas = pygame.Surface(atlas_size, pygame.SRCALPHA)
+    index = {"version": ATLAS_FORMAT_VERSION, "sprites": []}
+    for (name, size, flip, sprite), (x, y) in zip(sprites, positions):
+        atlas.blit(sprite, (x, y))
+        index["sprites"].append({"name": name, "size": list(size), "flip": flip, "rect": [x, y, size[0], size[1]]})
+
+    pygame.image.save(atlas, os.path.join(ASSET_DIR, ATLAS_IMAGE))
+    with open(os.path.join(ASSET_DIR, ATLAS_INDEX), "w") as f:
+        json.dump(index, f, indent=1)
+    print(f"Packed {len(sprites)} sprites into {ATLAS_IMAGE} ({atlas_size[0]}x{atlas_size[1]})")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if build_atlas() else 1)
@@ -0,0 +1,41 @@
+import time
+
+# Clock modes
+REAL_TIME = "real" # Game time follows the wall clock
+SCALED = "scaled" # Game time follows the wall clock times a scale factor
+VIRTUAL = "virtual" # Game time only moves by the dt handed to tick()
+
+class GameClock:
+    # The single source of game time. It is sampled once per frame with
+    # tick(), and everything in that frame reads the same clock.now, in
+    # milliseconds since the clock was created.
+    def __init__(self, mode=VIRTUAL, scale=1.0, time_source=time.perf_counter):
+        if mode not in (REAL_TIME, SCALED, VIRTUAL):
+            raise ValueError(f"Unknown clock mode: {mode}")
+        self.mode = mode
+        self.scale = scale if mode == SCALED else 1.0
+        self.time_source = time_source # Seconds, only used by the wall clock modes
+        self.now = 0
+        self.dt = 0 # Game milliseconds covered by the last tick
+        self.last_real_time = time_source() if mode != VIRTUAL else None
+
+    def tick(self, dt=None):
+        # Advance to the current frame and return the elapsed game time (ms).
+        # Virtual clocks need dt; wall clock modes measure it themselves.
+        if self.mode == VIRTUAL:
+            if dt is None:
+                raise ValueError("A virtual clock needs dt to advance")
+            elapsed = dt
+        else:
+            real_time = self.time_source()
+            elapsed = (real_time - self.last_real_time) * 1000 * self.scale
+            self.last_real_time = real_time
+        self.dt = elapsed
+        self.now += elapsed
+        return elapsed
+
+    def resync(self):
+        # Forget wall clock time that passed since the last tick (a pause,
+        # a menu screen), so the next tick doesn't jump ahead
+        if self.mode != VIRTUAL:
+            self.last_real_time = self.time_source()
@@ -0,0 +1,18 @@
+import logging
+import logging.handlers
+import queue
+
+def setup_logging(level="INFO"):
+    # Messages below level are dropped before they are formatted. The rest
+    # are queued by the game thread and written by a background listener
+    # thread, so a slow terminal never stalls a frame. Returns the listener;
+    # stop() it at exit to flush what is left.
+    log_queue = queue.SimpleQueue()
+    output = logging.StreamHandler()
+    output.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, output)
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener.start()
+    return listener
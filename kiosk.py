@@ -0,0 +1,211 @@
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import struct
+import sys
+import time
+import tracemalloc
+
+from balance import BotShooter
+from gamelog import setup_logging
+from replay import new_seed
+from settings import *
+from simulation import Simulation
+from snapshot import SnapshotEncoder
+
+logger = logging.getLogger(__name__)
+
+# Kiosk host: runs the game logic for several cabinets in one process. Each
+# cabinet connects over a local TCP socket and gets its own Simulation; all
+# of them are stepped together on one shared SIM_STEP_MS tick.
+#
+# Cabinet -> host: fixed-size input records, kind (u8), x (u16), y (u16).
+#   Positions past the screen edge are clamped to it. A click while no
+#   round is running starts one, like in main.py.
+# Host -> cabinet: messages of length (u32), screen (u8: START_SCREEN,
+#   PLAYING or GAME_OVER) and a snapshot.py snapshot. The first snapshot
+#   and every --keyframe-every'th are full, the rest are deltas.
+INPUT = struct.Struct("<BHH")
+FRAME = struct.Struct("<IB")
+
+# Input kinds
+CLICK = 0
+
+MAX_PENDING_BYTES = 64 * 1024 # Skip snapshots for a cabinet that isn't reading them
+
+class KioskSession:
+    # One cabinet's game: its Simulation, the screen it is on and the clicks
+    # waiting for the next tick. A session with a bot plays itself, for
+    # measuring how many cabinets fit on one core.
+    def __init__(self, session_id, seed, bot=None):
+        self.id = session_id
+        self.sim = Simulation(seed)
+        self.state = START_SCREEN
+        self.clicks = []
+        self.writer = None # Cabinet connection, if any
+        self.encoder = SnapshotEncoder()
+        self.snapshots_sent = 0
+        self.bot = bot
+        self.cpu_time = 0.0 # Seconds spent in step() since the last stats report
+
+    def click(self, pos):
+        if self.state == PLAYING:
+            self.clicks.append(pos)
+        else:
+            # Start or restart
+            self.sim.reset()
+            self.state = PLAYING
+
+    def step(self):
+        if self.bot:
+            if self.state == PLAYING:
+                self.clicks.extend(self.bot.choose_clicks(self.sim))
+            else:
+                self.click((0, 0))
+        if self.state != PLAYING:
+            return
+        self.sim.step(SIM_STEP_MS, self.clicks)
+        self.clicks = []
+        if self.sim.game_over:
+            self.state = GAME_OVER
+
+class KioskHost:
+    def __init__(self, snapshot_every=2, keyframe_every=60, seed=None):
+        self.sessions = {} # id -> KioskSession
+        self.next_id = 0
+        self.snapshot_every = snapshot_every # Ticks between snapshots
+        self.keyframe_every = keyframe_every # Snapshots between full ones
+        self.seed = seed # Sessions get seed, seed + 1, ... when set
+        self.ticks = 0
+        self.tick_times = [] # CPU seconds per tick since the last report
+        self.memory_baseline = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+
+    def add_session(self, bot_accuracy=None, bot_reaction_ms=None):
+        session_id = self.next_id
+        self.next_id += 1
+        seed = new_seed() if self.seed is None else self.seed + session_id
+        bot = BotShooter(bot_accuracy, bot_reaction_ms, random.Random(seed)) if bot_accuracy is not None else None
+        session = KioskSession(session_id, seed, bot)
+        self.sessions[session_id] = session
+        return session
+
+    async def handle_cabinet(self, reader, writer):
+        session = self.add_session()
+        session.writer = writer
+        logger.info("Cabinet %d connected from %s", session.id, writer.get_extra_info("peername"))
+        try:
+            while True:
+                kind, x, y = INPUT.unpack(await reader.readexactly(INPUT.size))
+                if kind == CLICK:
+                    # Snapshots can only hold on-screen positions
+                    session.click((min(x, SCREEN_WIDTH - 1), min(y, SCREEN_HEIGHT - 1)))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.sessions.pop(session.id, None) # tick() may have dropped it already
+            writer.close()
+            logger.info("Cabinet %d disconnected", session.id)
+
+    def tick(self):
+        send = self.ticks % self.snapshot_every == 0
+        tick_start = time.thread_time()
+        for session in list(self.sessions.values()):
+            try:
+                self.tick_session(session, send)
+            except Exception:
+                # One broken game must not stop the others
+                logger.exception("Session %d failed, dropping it", session.id)
+                del self.sessions[session.id]
+                if session.writer:
+                    session.writer.close()
+        self.tick_times.append(time.thread_time() - tick_start)
+        self.ticks += 1
+
+    def tick_session(self, session, send):
+        start = time.thread_time()
+        session.step()
+        session.cpu_time += time.thread_time() - start
+        writer = session.writer
+        if send and writer and writer.transport.get_write_buffer_size() < MAX_PENDING_BYTES:
+            full = session.snapshots_sent % self.keyframe_every == 0
+            snapshot = session.encoder.encode(session.sim, full)
+            writer.write(FRAME.pack(len(snapshot) + 1, session.state) + snapshot)
+            session.snapshots_sent += 1
+
+    def report(self, elapsed):
+        # Logs tick rate, CPU per session and, when tracemalloc is on, memory per session
+        sessions = len(self.sessions)
+        tick_times, self.tick_times = self.tick_times, []
+        if not tick_times:
+            return
+        step_s = SIM_STEP_MS / 1000
+        mean_tick = statistics.mean(tick_times)
+        line = (f"{sessions} sessions, {len(tick_times) / elapsed:.1f} ticks/s, "
+                f"tick CPU mean {mean_tick * 1000:.2f} ms / max {max(tick_times) * 1000:.2f} ms "
+                f"({mean_tick / step_s:.0%} of the {SIM_STEP_MS:.1f} ms budget)")
+        if sessions:
+            per_session = sum(session.cpu_time for session in self.sessions.values()) / sessions / len(tick_times)
+            for session in self.sessions.values():
+                session.cpu_time = 0.0
+            line += f", {per_session * 1e6:.0f} us per session tick"
+            if per_session:
+                line += f", ~{int(step_s / per_session)} sessions per core"
+        if self.memory_baseline is not None and sessions:
+            used = tracemalloc.get_traced_memory()[0] - self.memory_baseline
+            line += f", {used / sessions / 1024:.1f} KiB per session"
+        logger.info(line)
+
+    async def run(self, host, port, duration=None, report_every=5.0):
+        server = await asyncio.start_server(self.handle_cabinet, host, port)
+        logger.info("Kiosk host listening on %s:%d", host, port)
+        loop = asyncio.get_running_loop()
+        step_s = SIM_STEP_MS / 1000
+        start = next_tick = last_report = loop.time()
+        async with server:
+            while duration is None or loop.time() - start < duration:
+                steps = 0
+                while loop.time() >= next_tick and steps < MAX_SIM_STEPS_PER_FRAME:
+                    self.tick()
+                    next_tick += step_s
+                    steps += 1
+                if loop.time() >= next_tick:
+                    next_tick = loop.time() # Fell behind; drop the time instead of spiralling
+                now = loop.time()
+                if now - last_report >= report_every:
+                    self.report(now - last_report)
+                    last_report = now
+                await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+def main():
+    parser = argparse.ArgumentParser(description="Host the game logic for several cabinets in one process.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5757)
+    parser.add_argument("--bots", type=int, default=0, help="add this many self-playing sessions, for capacity tests")
+    parser.add_argument("--bot-accuracy", type=float, default=0.8)
+    parser.add_argument("--bot-reaction", type=float, default=400, help="bot reaction time in ms")
+    parser.add_argument("--snapshot-every", type=int, default=2, help="ticks between snapshots sent to each cabinet")
+    parser.add_argument("--keyframe-every", type=int, default=60, help="snapshots between full ones; the rest are deltas")
+    parser.add_argument("--seed", type=int, help="seed for the first session; later sessions count up from it")
+    parser.add_argument("--duration", type=float, help="stop after this many seconds")
+    parser.add_argument("--report", type=float, default=5.0, help="seconds between stats reports")
+    parser.add_argument("--trace-memory", action="store_true", help="measure memory per session with tracemalloc (slower)")
+    args = parser.parse_args()
+
+    log_listener = setup_logging(LOG_LEVEL)
+    if args.trace_memory:
+        tracemalloc.start()
+    host = KioskHost(args.snapshot_every, args.keyframe_every, args.seed)
+    for _ in range(args.bots):
+        host.add_session(args.bot_accuracy, args.bot_reaction)
+    try:
+        asyncio.run(host.run(args.host, args.port, args.duration, args.report))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        log_listener.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
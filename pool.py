@@ -0,0 +1,21 @@
+class EntityPool:
+    # Free lists of retired entities, one per class. acquire() re-runs
+    # setup() on a free instance (reusing its rect) instead of allocating a
+    # new one, so steady play allocates no entities once the lists have
+    # filled up. Each list is capped so a burst doesn't pin memory forever.
+    def __init__(self, max_free=256):
+        self.max_free = max_free
+        self.free = {} # class -> list of retired instances
+
+    def acquire(self, cls, *args):
+        free = self.free.get(cls)
+        if free:
+            entity = free.pop()
+            entity.setup(*args)
+            return entity
+        return cls(*args)
+
+    def release(self, entity):
+        free = self.free.setdefault(type(entity), [])
+        if len(free) < self.max_free:
+            free.append(entity)
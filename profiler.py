@@ -0,0 +1,85 @@
+import csv
+import json
+import time
+from collections import deque
+
+class FrameProfiler:
+    # Splits each frame into named phases. Call start_frame(), then
+    # mark(phase) at the end of every phase (the time since the previous
+    # mark is charged to that phase, summed if a phase repeats), then
+    # end_frame(). Keeps a rolling window per phase for p50/p99 and a trace
+    # of recent frames for export. While disabled every call returns
+    # immediately.
+    def __init__(self, enabled=False, window=300, trace_frames=3600, refresh_frames=30, time_source=time.perf_counter):
+        self.enabled = enabled
+        self.window = window
+        self.refresh_frames = refresh_frames # Frames between overlay updates
+        self.time_source = time_source
+        self.history = {} # phase -> deque of the last `window` durations (ms)
+        self.trace = deque(maxlen=trace_frames) # Per-frame {phase: ms}
+        self.lines = [] # Overlay text, refreshed every refresh_frames
+        self.current = None
+        self.frame_start = 0
+        self.last_mark = 0
+        self.frame_count = 0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.current = None
+
+    def start_frame(self):
+        if not self.enabled:
+            return
+        self.current = {}
+        self.frame_start = self.last_mark = self.time_source()
+
+    def mark(self, phase):
+        if self.current is None:
+            return
+        now = self.time_source()
+        self.current[phase] = self.current.get(phase, 0) + (now - self.last_mark) * 1000
+        self.last_mark = now
+
+    def end_frame(self):
+        if self.current is None:
+            return
+        frame = self.current
+        frame["total"] = (self.time_source() - self.frame_start) * 1000
+        for phase, ms in frame.items():
+            samples = self.history.get(phase)
+            if samples is None:
+                samples = self.history[phase] = deque(maxlen=self.window)
+            samples.append(ms)
+        self.trace.append(frame)
+        self.current = None
+        self.frame_count += 1
+        if self.frame_count % self.refresh_frames == 0:
+            self.lines = self.summary_lines()
+
+    def percentiles(self):
+        # {phase: (p50, p99)} in ms over the rolling window
+        stats = {}
+        for phase, samples in self.history.items():
+            ordered = sorted(samples)
+            stats[phase] = (ordered[len(ordered) // 2], ordered[min(len(ordered) - 1, len(ordered) * 99 // 100)])
+        return stats
+
+    def summary_lines(self):
+        lines = [f"{'phase':<16}{'p50':>7}{'p99':>7}"]
+        for phase, (p50, p99) in self.percentiles().items():
+            lines.append(f"{phase:<16}{p50:>7.2f}{p99:>7.2f}")
+        return lines
+
+    def export(self, path):
+        # Write the trace as JSON (a list of frames) or, for a .csv path, one
+        # row per frame with a column per phase
+        phases = list(self.history)
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(phases)
+                for frame in self.trace:
+                    writer.writerow([f"{frame.get(phase, 0):.4f}" for phase in phases])
+        else:
+            with open(path, "w") as f:
+                json.dump({"phases": phases, "frames": list(self.trace)}, f)
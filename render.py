@@ -0,0 +1,274 @@
+import pygame
+
+from profiler import FrameProfiler
+from settings import *
+
+GAME_OVER_MESSAGES = {
+    GAME_OVER_SHOT: "You were shot!",
+    GAME_OVER_OUT_OF_AMMO: "Out of ammo!",
+    GAME_OVER_CIVILIAN: "You shot a civilian!",
+}
+
+# --- Drawing Helpers ---
+# Each returns the rect it drew over, for dirty-rect updates
+def draw_sprite(surface, rect, color, image, assets, flip=False):
+    if image:
+        # Blit the cached copy scaled to fit the rect
+        return surface.blit(assets.get_sprite(image, rect.size, flip), rect.topleft)
+    return pygame.draw.rect(surface, color, rect) # Fallback
+
+def draw_health_pack(surface, pack):
+    pygame.draw.rect(surface, pack.color, pack.rect)
+    # Simple '+' sign
+    pygame.draw.line(surface, RED, (pack.rect.centerx - 5, pack.rect.centery), (pack.rect.centerx + 5, pack.rect.centery), 3)
+    pygame.draw.line(surface, RED, (pack.rect.centerx, pack.rect.centery - 5), (pack.rect.centerx, pack.rect.centery + 5), 3)
+    return pack.rect
+
+def draw_shot_effect(surface, effect):
+    return pygame.draw.line(surface, effect.color, effect.start_pos, effect.end_pos, 2)
+
+class Renderer:
+    # Draws the three screens. While playing, only the regions that changed
+    # are repainted and pushed to the display (see DIRTY_RECT_RENDERING).
+    # Everything is drawn at SCREEN_WIDTH x SCREEN_HEIGHT. If the window is a
+    # different size, that happens on an offscreen surface which present()
+    # upscales into the window once per frame.
+    def __init__(self, window, assets, text_cache, profiler=None, scores=None):
+        self.set_window(window)
+        self.assets = assets
+        self.text_cache = text_cache
+        self.profiler = profiler or FrameProfiler() # Disabled unless one is passed in
+        self.scores = scores # ScoreStore for the leaderboard, optional
+        self.static_scene = None
+        self.scene_version = None # assets.version the static scene was built from
+        self.dirty_rects = [] # Regions drawn over last frame, restored from static_scene
+        self.previous_dirty_rects = []
+        self.full_redraw = True # Next PLAYING frame must repaint and push the whole screen
+
+    def invalidate(self):
+        # Window contents were lost, repaint everything next frame
+        self.full_redraw = True
+
+    def set_window(self, window):
+        # Called again after the window is resized
+        self.window = window
+        internal_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        if window.get_size() == internal_size:
+            self.screen = window # Draw straight to the display
+            self.viewport = None
+        else:
+            if getattr(self, "screen", window) is window:
+                self.screen = pygame.Surface(internal_size).convert()
+            # Largest rect with the game's aspect ratio, centered in the window
+            self.viewport = pygame.Rect((0, 0), internal_size).fit(window.get_rect())
+            self.viewport_surface = window.subsurface(self.viewport) # Upscale target
+            window.fill(BLACK) # Letterbox bars
+        self.full_redraw = True
+
+    def to_internal(self, pos):
+        # Map a window position (mouse events) to game coordinates, or None
+        # if it is on the letterbox bars
+        if self.viewport is None:
+            return pos
+        if not self.viewport.collidepoint(pos):
+            return None
+        x = (pos[0] - self.viewport.x) * SCREEN_WIDTH // self.viewport.width
+        y = (pos[1] - self.viewport.y) * SCREEN_HEIGHT // self.viewport.height
+        return (x, y)
+
+    # --- Static Scene ---
+    def build_static_scene(self):
+        # Background and buildings never change, so they are composed once and
+        # used to restore the regions entities were drawn over
+        assets = self.assets
+        scene = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        background_img = assets.get("background")
+        if background_img:
+            scene.blit(assets.get_sprite(background_img, (SCREEN_WIDTH, SCREEN_HEIGHT)), (0, 0))
+        else:
+            # Fallback to colored rectangles
+            # Sky
+            pygame.draw.rect(scene, SKY_BLUE, (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT // 2))
+            # Ground
+            pygame.draw.rect(scene, SANDY_BROWN, (0, SCREEN_HEIGHT // 2, SCREEN_WIDTH, SCREEN_HEIGHT // 2))
+
+        # Simple Buildings (drawn before characters)
+        building_img = assets.get("building")
+        if building_img:
+            for rect in BUILDING_RECTS:
+                scene.blit(assets.get_sprite(building_img, rect.size), rect.topleft)
+        else:
+            # Fallback to colored rectangles
+            for rect in BUILDING_RECTS:
+                pygame.draw.rect(scene, BUILDING_BROWN, rect)
+        return scene
+
+    # --- Screens ---
+    def draw(self, game_state, sim, mouse_pos):
+        if game_state == START_SCREEN:
+            self.draw_start_screen()
+        elif game_state == PLAYING:
+            self.draw_playing(sim, mouse_pos)
+        elif game_state == GAME_OVER:
+            self.draw_game_over(sim)
+        if self.profiler.enabled:
+            self.draw_profiler_overlay()
+        self.present(game_state)
+
+    def draw_start_screen(self):
+        screen = self.screen
+        start_background_img = self.assets.get("start_background")
+        if start_background_img:
+            screen.blit(self.assets.get_sprite(start_background_img, (SCREEN_WIDTH, SCREEN_HEIGHT)), (0,0))
+        else:
+            screen.fill(BLACK) # Fallback background
+
+        title_text = self.text_cache.render("Western Shooter", YELLOW, TITLE_FONT_SIZE)
+        start_text = self.text_cache.render("Click to Start", WHITE, SUBTITLE_FONT_SIZE)
+
+        screen.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, SCREEN_HEIGHT // 3 - title_text.get_height() // 2))
+        screen.blit(start_text, (SCREEN_WIDTH // 2 - start_text.get_width() // 2, SCREEN_HEIGHT // 2))
+        if self.scores:
+            self.draw_leaderboard(SCREEN_HEIGHT // 2 + 60)
+        self.profiler.mark("draw_screen")
+
+        if not self.assets.loaded:
+            loaded, total = self.assets.progress
+            loading_text = self.text_cache.render(f"Loading assets... {loaded}/{total}", WHITE, FONT_SIZE)
+            screen.blit(loading_text, (SCREEN_WIDTH // 2 - loading_text.get_width() // 2, SCREEN_HEIGHT - 60))
+
+    def draw_leaderboard(self, y):
+        # Kept up to date by the score writer thread; no database access here
+        leaderboard = self.scores.leaderboard
+        if not leaderboard:
+            return
+        for rank, (score, level, kills) in enumerate(leaderboard, 1):
+            line = self.text_cache.render(f"{rank}. ${score}   Level {level}   Kills {kills}", YELLOW, LEADERBOARD_FONT_SIZE)
+            self.screen.blit(line, (SCREEN_WIDTH // 2 - line.get_width() // 2, y))
+            y += LEADERBOARD_FONT_SIZE
+
+    def draw_playing(self, sim, mouse_pos):
+        screen = self.screen
+        assets = self.assets
+        text_cache = self.text_cache
+        if self.scene_version != assets.version:
+            # New images arrived since the scene was composed
+            self.static_scene = self.build_static_scene()
+            self.scene_version = assets.version
+            self.full_redraw = True
+
+        if self.full_redraw or not DIRTY_RECT_RENDERING:
+            screen.blit(self.static_scene, (0, 0))
+        else:
+            # Erase last frame's entities by restoring the scene under them
+            for rect in self.dirty_rects:
+                screen.blit(self.static_scene, rect, rect)
+        self.previous_dirty_rects = self.dirty_rects
+        self.dirty_rects = dirty_rects = []
+        profiler = self.profiler
+        profiler.mark("draw_scene")
+
+        # Draw Bandits
+        bandit_img = assets.get("bandit")
+        for bandit in sim.bandits:
+            dirty_rects.append(draw_sprite(screen, bandit.rect, bandit.color, bandit_img, assets, bandit.flipped))
+
+        # Draw Civilians
+        civilian_img = assets.get("civilian")
+        for civilian in sim.civilians:
+            dirty_rects.append(draw_sprite(screen, civilian.rect, civilian.color, civilian_img, assets, civilian.flipped))
+        profiler.mark("draw_characters")
+
+        # Draw Dead Bandits
+        dead_bandit_img = assets.get("dead_bandit")
+        for dead_bandit in sim.dead_bandits:
+            dirty_rects.append(draw_sprite(screen, dead_bandit.rect, dead_bandit.color, dead_bandit_img, assets))
+
+        # Draw Health Packs
+        for pack in sim.health_packs:
+            dirty_rects.append(draw_health_pack(screen, pack))
+        profiler.mark("draw_pickups")
+
+        # Draw Shot Effects
+        for effect in sim.player_shot_effects:
+            dirty_rects.append(draw_shot_effect(screen, effect))
+        for effect in sim.bandit_shot_effects:
+            dirty_rects.append(draw_shot_effect(screen, effect))
+        profiler.mark("draw_effects")
+
+        # Draw UI
+        score_text = text_cache.render(f"Cash: ${sim.score}", YELLOW, FONT_SIZE)
+        ammo_text = text_cache.render(f"Ammo: {sim.ammo}", WHITE, FONT_SIZE)
+        health_text = text_cache.render(f"Health: {sim.player_health}", RED, FONT_SIZE)
+        dirty_rects.append(screen.blit(score_text, (10, 10)))
+        dirty_rects.append(screen.blit(ammo_text, (SCREEN_WIDTH - ammo_text.get_width() - 10, 10)))
+        dirty_rects.append(screen.blit(health_text, (SCREEN_WIDTH // 2 - health_text.get_width() // 2, 10)))
+
+        # Draw Level Info
+        level_text = text_cache.render(f"Level: {sim.level + 1}", WHITE, FONT_SIZE)
+        kills_text = text_cache.render(f"Kills: {sim.bandits_killed}", WHITE, FONT_SIZE)
+        dirty_rects.append(screen.blit(level_text, (10, 40)))
+        dirty_rects.append(screen.blit(kills_text, (10, 70)))
+
+        # Draw Crosshair, unless the mouse is outside the game (mouse_pos None)
+        if mouse_pos is not None:
+            mouse_x, mouse_y = mouse_pos
+            crosshair_color = WHITE
+            dirty_rects.append(pygame.draw.line(screen, crosshair_color, (mouse_x - 15, mouse_y), (mouse_x + 15, mouse_y), 2))
+            dirty_rects.append(pygame.draw.line(screen, crosshair_color, (mouse_x, mouse_y - 15), (mouse_x, mouse_y + 15), 2))
+            dirty_rects.append(pygame.draw.circle(screen, crosshair_color, (mouse_x, mouse_y), 10, 1))
+        profiler.mark("hud")
+
+    def draw_game_over(self, sim):
+        screen = self.screen
+        text_cache = self.text_cache
+        screen.fill(BLACK)
+        # TODO: Draw Game Over screen
+        game_over_text = text_cache.render("GAME OVER", RED, FONT_SIZE)
+        screen.blit(game_over_text, (SCREEN_WIDTH // 2 - game_over_text.get_width() // 2, SCREEN_HEIGHT // 2 - 50))
+        final_score_text = text_cache.render(f"Final Cash: ${sim.score}", YELLOW, FONT_SIZE)
+        screen.blit(final_score_text, (SCREEN_WIDTH // 2 - final_score_text.get_width() // 2, SCREEN_HEIGHT // 2))
+        reason_text = text_cache.render(GAME_OVER_MESSAGES[sim.game_over_reason], WHITE, FONT_SIZE)
+
+        screen.blit(reason_text, (SCREEN_WIDTH // 2 - reason_text.get_width() // 2, SCREEN_HEIGHT // 2 + 25))
+
+        restart_text = text_cache.render("Click to Restart", WHITE, FONT_SIZE)
+        screen.blit(restart_text, (SCREEN_WIDTH // 2 - restart_text.get_width() // 2, SCREEN_HEIGHT // 2 + 75))
+        if self.scores:
+            # Includes the run that just ended once the score writer has saved it
+            self.draw_leaderboard(SCREEN_HEIGHT // 2 + 75 + FONT_SIZE + 15)
+        self.profiler.mark("draw_screen")
+
+    def draw_profiler_overlay(self):
+        # Rolling p50/p99 per phase in the bottom-left corner
+        lines = self.profiler.lines
+        if not lines:
+            return
+        line_height = PROFILER_FONT_SIZE
+        panel = pygame.Rect(0, 0, 260, line_height * len(lines) + 8)
+        panel.bottomleft = (0, SCREEN_HEIGHT)
+        self.dirty_rects.append(self.screen.fill(BLACK, panel))
+        for i, line in enumerate(lines):
+            text = self.text_cache.render(line, GREEN, PROFILER_FONT_SIZE)
+            self.screen.blit(text, (panel.x + 4, panel.y + 4 + i * line_height))
+        self.profiler.mark("profiler_overlay")
+
+    # --- Update Display ---
+    def present(self, game_state):
+        if self.viewport is not None:
+            # One scale pass for the whole frame, straight into the window
+            if UPSCALE_FILTER == "smooth":
+                pygame.transform.smoothscale(self.screen, self.viewport.size, self.viewport_surface)
+            else:
+                pygame.transform.scale(self.screen, self.viewport.size, self.viewport_surface)
+            pygame.display.flip()
+        elif game_state == PLAYING and DIRTY_RECT_RENDERING and not self.full_redraw:
+            # Push where entities were last frame (now erased) and where they are now
+            pygame.display.update(self.previous_dirty_rects + self.dirty_rects)
+        else:
+            pygame.display.flip()
+        # Leaving PLAYING paints over the scene, so coming back needs a full repaint
+        self.full_redraw = game_state != PLAYING
+        if self.full_redraw:
+            self.dirty_rects = [] # The profiler overlay adds to them on every screen
+        self.profiler.mark("flip")
@@ -0,0 +1,117 @@
+import argparse
+import random
+import struct
+import sys
+import time
+
+from settings import SIM_STEP_MS
+from simulation import Simulation
+
+# Session recording format (little-endian):
+#   header: magic b"WSRP", format version (u8), RNG seed (u64), step ms (f64)
+#   records: simulation step index (u32), kind (u8), x (u16), y (u16)
+#   the END record is followed by a digest of the final state, so a replay
+#   can check that it reproduced the session exactly
+MAGIC = b"WSRP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sBQd")
+RECORD = struct.Struct("<IBHH")
+DIGEST = struct.Struct("<iiii")
+
+# Record kinds
+CLICK = 0
+RESET = 1 # A new round was started before this step
+END = 2
+
+MAX_SEED = 2**64 - 1 # The header stores the seed as a u64
+
+def new_seed():
+    return random.getrandbits(63)
+
+def seed_arg(text):
+    # argparse type for a seed that fits in a recording's header
+    try:
+        seed = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid seed: {text!r}")
+    if not 0 <= seed <= MAX_SEED:
+        raise argparse.ArgumentTypeError(f"seed must be between 0 and {MAX_SEED}, got {seed}")
+    return seed
+
+def state_digest(sim):
+    return (sim.score, sim.bandits_killed, sim.player_health, sim.ammo)
+
+class SessionRecorder:
+    # Logs everything that feeds a Simulation: its seed, the round resets
+    # and the left clicks, each stamped with the simulation step they were
+    # delivered to. Records are buffered in memory and written on close().
+    def __init__(self, path, seed, step_ms=SIM_STEP_MS):
+        self.path = path
+        self.buffer = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, seed, step_ms))
+
+    def record_reset(self, step):
+        self.buffer += RECORD.pack(step, RESET, 0, 0)
+
+    def record_clicks(self, step, clicks):
+        for x, y in clicks:
+            self.buffer += RECORD.pack(step, CLICK, max(0, min(x, 0xFFFF)), max(0, min(y, 0xFFFF)))
+
+    def close(self, sim):
+        self.buffer += RECORD.pack(sim.steps, END, 0, 0)
+        self.buffer += DIGEST.pack(*state_digest(sim))
+        with open(self.path, "wb") as f:
+            f.write(self.buffer)
+
+def load_session(path):
+    # Returns (seed, step_ms, records, end step, digest)
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, seed, step_ms = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} session recording")
+    records = []
+    offset = HEADER.size
+    while True:
+        step, kind, x, y = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if kind == END:
+            return seed, step_ms, records, step, DIGEST.unpack_from(data, offset)
+        records.append((step, kind, (x, y)))
+
+def replay_session(path):
+    # Re-runs a recorded session headless, as fast as possible. Returns the
+    # simulation and whether its final state matches the recording.
+    seed, step_ms, records, end_step, digest = load_session(path)
+    sim = Simulation(seed)
+    next_record = 0
+    for step in range(end_step):
+        clicks = []
+        while next_record < len(records) and records[next_record][0] == step:
+            _, kind, pos = records[next_record]
+            if kind == RESET:
+                sim.reset()
+            else:
+                clicks.append(pos)
+            next_record += 1
+        sim.step(step_ms, clicks)
+    return sim, state_digest(sim) == digest
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded session headless at maximum speed.")
+    parser.add_argument("session", help="file written by python main.py --record")
+    parser.add_argument("--repeat", type=int, default=1, help="replay this many times and report the best time")
+    args = parser.parse_args()
+
+    best = None
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        sim, matches = replay_session(args.session)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"Replayed {sim.steps} steps in {best * 1000:.1f} ms ({sim.steps / best:.0f} steps/s)")
+    print(f"Final state: cash ${sim.score}, kills {sim.bandits_killed}, health {sim.player_health}, ammo {sim.ammo}")
+    print("Final state matches the recording" if matches else "Final state DIFFERS from the recording")
+    return 0 if matches else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+import pygame
+
+from gameclock import GameClock, REAL_TIME, SCALED
+
+# Frame pacing modes
+TARGET_FPS = "target" # Sleep so frames don't run faster than the target FPS
+VSYNC = "vsync" # Let the display flip wait for the monitor refresh
+UNCAPPED = "uncapped" # Render as fast as possible
+
+class FrameScheduler:
+    # Ticks once per frame and hands out fixed-size simulation steps from an
+    # accumulator, so game logic runs at a steady rate no matter how fast
+    # frames are rendered.
+    def __init__(self, mode=TARGET_FPS, fps=60, step_ms=1000 / 60, max_steps=5, time_scale=1.0):
+        if mode not in (TARGET_FPS, VSYNC, UNCAPPED):
+            raise ValueError(f"Unknown frame pacing mode: {mode}")
+        self.mode = mode
+        self.fps = fps
+        self.step_ms = step_ms
+        self.max_steps = max_steps # Drop time instead of spiralling after a long frame
+        self.pacing_clock = pygame.time.Clock()
+        self.frame_clock = GameClock(SCALED, scale=time_scale) if time_scale != 1.0 else GameClock(REAL_TIME)
+        self.accumulator = 0
+        self.frame_ms = 0
+
+    def tick(self):
+        # Call once per frame. Waits if the mode caps the frame rate and
+        # returns the frame time in (scaled) milliseconds.
+        if self.mode == TARGET_FPS:
+            self.pacing_clock.tick(self.fps)
+        else:
+            self.pacing_clock.tick()
+        self.frame_ms = self.frame_clock.tick()
+        self.accumulator = min(self.accumulator + self.frame_ms, self.step_ms * self.max_steps)
+        return self.frame_ms
+
+    def steps(self):
+        # Number of fixed simulation steps due this frame
+        count = int(self.accumulator // self.step_ms)
+        self.accumulator -= count * self.step_ms
+        return count
+
+    def reset(self):
+        # Start accumulating from scratch, e.g. when a new round starts
+        self.accumulator = 0
+
+    def get_fps(self):
+        return self.pacing_clock.get_fps()
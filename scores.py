@@ -0,0 +1,169 @@
+import argparse
+import logging
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+from assets import ASSET_DIR
+from settings import *
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    cabinet TEXT NOT NULL,
+    started_at REAL NOT NULL, -- Unix time
+    duration_s REAL NOT NULL, -- Game time
+    score INTEGER NOT NULL,
+    kills INTEGER NOT NULL,
+    level INTEGER NOT NULL, -- As shown in game, starting at 1
+    reason TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_cabinet_score ON runs (cabinet, score DESC);
+CREATE TABLE IF NOT EXISTS level_times (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    level INTEGER NOT NULL,
+    reached_s REAL NOT NULL, -- Game time since the run started
+    PRIMARY KEY (run_id, level)
+);
+"""
+
+class RunTracker:
+    # Follows one round for the score store: when it started and the game
+    # time at which each new level was reached. Call update() after every
+    # simulation step.
+    def __init__(self, sim):
+        self.started_at = time.time()
+        self.start_time = sim.clock.now
+        self.level = sim.level
+        self.level_times = [] # (level, seconds)
+
+    def update(self, sim):
+        if sim.level != self.level:
+            self.level = sim.level
+            self.level_times.append((sim.level + 1, (sim.clock.now - self.start_time) / 1000))
+
+    def result(self, sim, cabinet=CABINET_ID):
+        return {
+            "cabinet": cabinet,
+            "started_at": self.started_at,
+            "duration_s": (sim.clock.now - self.start_time) / 1000,
+            "score": sim.score,
+            "kills": sim.bandits_killed,
+            "level": sim.level + 1,
+            "reason": sim.game_over_reason,
+            "level_times": self.level_times,
+        }
+
+def top_scores(conn, cabinet, limit):
+    return conn.execute("SELECT score, level, kills FROM runs WHERE cabinet = ? ORDER BY score DESC, id LIMIT ?",
+                        (cabinet, limit)).fetchall()
+
+def write_runs(conn, runs):
+    # One transaction (and one sync to disk) for the whole batch
+    with conn:
+        for run in runs:
+            cursor = conn.execute(
+                "INSERT INTO runs (cabinet, started_at, duration_s, score, kills, level, reason) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run["cabinet"], run["started_at"], run["duration_s"], run["score"], run["kills"], run["level"], run["reason"]))
+            conn.executemany("INSERT INTO level_times (run_id, level, reached_s) VALUES (?, ?, ?)",
+                             [(cursor.lastrowid, level, seconds) for level, seconds in run["level_times"]])
+
+class ScoreStore:
+    # High scores and per-run analytics in SQLite. The game thread only
+    # queues finished runs; a background thread owns the connection and
+    # writes them in batches (up to SCORE_BATCH_SIZE runs, or whatever
+    # arrived within SCORE_FLUSH_INTERVAL seconds of the first). After each
+    # batch it refreshes leaderboard, which the start and game over screens
+    # read without touching the database.
+    def __init__(self, path, cabinet=CABINET_ID, leaderboard_size=LEADERBOARD_SIZE):
+        self.path = path
+        self.cabinet = cabinet
+        self.leaderboard_size = leaderboard_size
+        self.leaderboard = [] # [(score, level, kills)], best first
+        self.runs = queue.SimpleQueue() # Finished runs, None to stop
+        self.writer = threading.Thread(target=self._write_loop, name="score-writer", daemon=True)
+        self.writer.start()
+
+    def record_run(self, run):
+        self.runs.put(run)
+
+    def close(self):
+        # Writes whatever is still queued
+        self.runs.put(None)
+        self.writer.join()
+
+    def _next_batch(self):
+        batch = [self.runs.get()]
+        deadline = time.monotonic() + SCORE_FLUSH_INTERVAL
+        while batch[-1] is not None and len(batch) < SCORE_BATCH_SIZE:
+            try:
+                batch.append(self.runs.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_loop(self):
+        try:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL") # Readers (the stats report) don't block the writer
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self.leaderboard = top_scores(conn, self.cabinet, self.leaderboard_size)
+        except sqlite3.Error as e:
+            logger.warning("Cannot open score database %s: %s. Scores won't be saved.", self.path, e)
+            return
+        running = True
+        while running:
+            batch = self._next_batch()
+            if batch[-1] is None:
+                running = False
+                batch.pop()
+            if not batch:
+                continue
+            try:
+                write_runs(conn, batch)
+                self.leaderboard = top_scores(conn, self.cabinet, self.leaderboard_size)
+                logger.debug("Saved %d runs to %s", len(batch), self.path)
+            except sqlite3.Error as e:
+                logger.warning("Cannot save %d runs to %s: %s", len(batch), self.path, e)
+        conn.close()
+
+def print_stats(conn, cabinet=None):
+    # Per-cabinet summary for operators
+    where, params = ("WHERE cabinet = ?", (cabinet,)) if cabinet else ("", ())
+    rows = conn.execute(f"""
+        SELECT cabinet, COUNT(*), MAX(score), AVG(score), AVG(duration_s), AVG(level),
+               AVG(reason = ?), AVG(reason = ?), AVG(reason = ?)
+        FROM runs {where} GROUP BY cabinet ORDER BY cabinet""",
+        (GAME_OVER_SHOT, GAME_OVER_CIVILIAN, GAME_OVER_OUT_OF_AMMO) + params).fetchall()
+    if not rows:
+        print("No runs recorded")
+    for name, runs, best, mean_score, mean_duration, mean_level, shot, civilian, out_of_ammo in rows:
+        print(f"{name}: {runs} runs, best ${best}, mean ${mean_score:.0f}, mean {mean_duration:.1f} s, "
+              f"mean level {mean_level:.1f}; shot {shot:.0%}, civilian {civilian:.0%}, out of ammo {out_of_ammo:.0%}")
+        level_rows = conn.execute("""
+            SELECT level_times.level, COUNT(*), AVG(reached_s) FROM level_times JOIN runs ON runs.id = run_id
+            WHERE cabinet = ? GROUP BY level_times.level ORDER BY level_times.level""", (name,)).fetchall()
+        for level, reached, mean_reached in level_rows:
+            print(f"  level {level}: reached in {reached} runs, after {mean_reached:.1f} s on average")
+
+def main():
+    parser = argparse.ArgumentParser(description="Show high score and run statistics per cabinet.")
+    parser.add_argument("--db", default=os.path.join(ASSET_DIR, SCORES_DB))
+    parser.add_argument("--cabinet", help="only this cabinet")
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        print(f"{args.db} does not exist")
+        return 1
+    conn = sqlite3.connect(args.db)
+    print_stats(conn, args.cabinet)
+    conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
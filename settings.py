@@ -0,0 +1,129 @@
+import pygame
+
+# --- Constants ---
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+FPS = 60
+TIME_SCALE = 1.0 # Game speed relative to real time
+
+# Frame pacing
+FRAME_PACING = "target" # "target" (cap at FPS), "vsync" (wait for the display) or "uncapped"
+SIM_STEP_MS = 1000 / 60 # Fixed timestep for the game logic, independent of the frame rate
+MAX_SIM_STEPS_PER_FRAME = 5 # After a long frame, drop time beyond this many steps
+
+# Colors
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+BROWN = (139, 69, 19) # For bandits
+GRAY = (128, 128, 128) # For civilians
+YELLOW = (255, 255, 0) # For cash text
+DARK_RED = (139, 0, 0) # For dead bandits
+SKY_BLUE = (135, 206, 235)
+SANDY_BROWN = (244, 164, 96)
+BUILDING_BROWN = (160, 82, 45)
+
+# Scale Factor
+SCALE_FACTOR = 1.5
+
+# Character settings
+CHARACTER_WIDTH = int(50 * SCALE_FACTOR) # Base width 50
+CHARACTER_HEIGHT = int(80 * SCALE_FACTOR) # Base height 80
+BANDIT_SPAWN_RATE = 1.5 # Lower means faster spawns (seconds)
+CIVILIAN_SPAWN_RATE = 3.0
+MAX_CHARACTERS_ON_SCREEN = 5 # Limit total bandits + civilians
+DEAD_BANDIT_DESPAWN_TIME = 5000 # milliseconds (5 seconds)
+AMMO_PER_COLLECT = 2
+CIVILIAN_SPEED = 2
+MAX_BANDITS_ON_SCREEN = 4 # Specific limit for bandits
+SPATIAL_CELL_SIZE = 64 # px, grid cell size for click hit-testing
+
+# Difficulty Scaling
+KILLS_PER_LEVEL = 5
+SPAWN_RATE_DECREASE_PER_LEVEL = 0.1 # seconds
+MIN_BANDIT_SPAWN_RATE = 0.5 # seconds
+
+# Player settings
+MAX_PLAYER_HEALTH = 3
+MAX_TOTAL_HEALTH = 5 # Maximum possible health
+STARTING_AMMO = 6 # Revolver capacity
+PLAYER_POSITION = (SCREEN_WIDTH // 2, SCREEN_HEIGHT - 10) # Where shot lines start/end
+
+# Bandit settings
+BANDIT_MIN_SHOOT_DELAY = 2000 # ms (2 seconds)
+BANDIT_MAX_SHOOT_DELAY = 5000 # ms (5 seconds)
+
+# Item settings
+HEALTH_PACK_DROP_CHANCE = 0.20 # 20% chance
+HEALTH_PACK_SIZE = int(20 * SCALE_FACTOR) # Base size 20
+HEALTH_PACK_DESPAWN_TIME = 7000 # ms (7 seconds)
+
+# Visuals
+SHOT_LINE_DURATION = 100 # ms (0.1 seconds)
+PLAYER_SHOT_COLOR = YELLOW
+BANDIT_SHOT_COLOR = RED
+
+# Text
+FONT_SIZE = 36
+TITLE_FONT_SIZE = 72
+SUBTITLE_FONT_SIZE = 48
+TEXT_CACHE_SIZE = 64 # Rendered labels kept, least recently used are dropped first
+
+# Assets
+ASSET_LOADER_THREADS = 4 # Worker threads decoding images at startup
+USE_SPRITE_ATLAS = True # Use sprites_atlas.png (see build_atlas.py) when it exists
+
+# Audio
+MUSIC_ENABLED = True
+SFX_ENABLED = True # The mixer is not started at all when both are False
+MUSIC_FILE = "background.mp3"
+MIXER_FREQUENCY = 44100
+MIXER_BUFFER = 256 # Samples per mixer chunk: smaller means less delay after a click, too small crackles
+SFX_CHANNELS = 8 # Effects playing at once; the longest-playing one is cut off for a new one
+SFX_VOLUME = 0.8
+
+# High scores
+SCORES_ENABLED = True
+SCORES_DB = "scores.db" # SQLite file next to main.py
+CABINET_ID = "cabinet-1" # Runs are stored and ranked per cabinet
+LEADERBOARD_SIZE = 5 # Entries shown on the start and game over screens
+LEADERBOARD_FONT_SIZE = 28
+SCORE_BATCH_SIZE = 32 # Most runs written in one transaction
+SCORE_FLUSH_INTERVAL = 2.0 # Seconds a finished run may wait for others to batch with
+
+# Diagnostics
+LOG_LEVEL = "INFO" # "DEBUG" also logs pickups, shots and hits
+PROFILER_ENABLED = False # Toggle in game with PROFILER_TOGGLE_KEY
+PROFILER_TOGGLE_KEY = "f3"
+PROFILER_EXPORT_KEY = "f4" # Writes the trace to PROFILER_TRACE_FILE
+PROFILER_TRACE_FILE = "frame_trace.csv" # .csv or .json
+PROFILER_WINDOW = 300 # Frames in the rolling p50/p99 window
+PROFILER_FONT_SIZE = 20
+
+# Scenery
+BUILDING_RECTS = [
+    pygame.Rect(50, SCREEN_HEIGHT // 2 - 150, 100 * 2, 150 * 2),
+    pygame.Rect(200, SCREEN_HEIGHT // 2 - 120, 120 * 2, 120 * 2),
+    pygame.Rect(SCREEN_WIDTH - 150, SCREEN_HEIGHT // 2 - 170, 100 * 2, 170 * 2)
+]
+
+# Rendering
+DIRTY_RECT_RENDERING = True # Only push changed regions to the display while playing
+# The game always renders at SCREEN_WIDTH x SCREEN_HEIGHT. A different window
+# size (or fullscreen) gets that frame upscaled once, letterboxed to keep its
+# aspect ratio. With vsync pacing SDL scales on the GPU instead.
+WINDOW_SIZE = (SCREEN_WIDTH, SCREEN_HEIGHT)
+FULLSCREEN = False # Use the desktop resolution
+UPSCALE_FILTER = "nearest" # "nearest" (fastest, blocky) or "smooth" (bilinear)
+
+# Game states
+PLAYING = 0
+GAME_OVER = 1
+START_SCREEN = 2
+
+# Game over reasons
+GAME_OVER_SHOT = "shot"
+GAME_OVER_CIVILIAN = "civilian"
+GAME_OVER_OUT_OF_AMMO = "out_of_ammo"
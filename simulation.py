@@ -0,0 +1,381 @@
+import logging
+import random
+
+import pygame
+
+from gameclock import GameClock
+from pool import EntityPool
+from profiler import FrameProfiler
+from settings import *
+from spatial import SpatialGrid
+from timers import TimerQueue
+
+logger = logging.getLogger(__name__)
+
+# The game rules, with no display, input or audio dependencies. Only
+# pygame.Rect is used, which works without pygame.init(). Time comes from an
+# injected GameClock that is ticked once per step; entities are handed that
+# one timestamp instead of reading the time themselves. With the default
+# virtual clock, rounds can be simulated much faster than real time.
+
+# Entities use __slots__ (no per-instance dict) and store absolute
+# deadlines (expire_time, next_shot_time) computed once. The simulation
+# registers those deadlines in TimerQueues when the entity is added, so each
+# step only handles the expiries and shots that are actually due instead of
+# checking every entity.
+
+# Entities are recycled through an EntityPool: __init__ only allocates the
+# rect and setup() does the rest, so a retired instance can be set up again
+# in place with the same arguments as its constructor.
+
+# --- Character Classes ---
+class Character:
+    __slots__ = ("entity_id", "rect", "color", "spawn_time", "visible_duration", "expire_time", "flipped")
+
+    def __init__(self, *args):
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.setup(*args)
+
+    def setup(self, x, y, width, height, color, now, rng):
+        self.rect.update(x, y, width, height)
+        self.color = color
+        self.spawn_time = now
+        self.visible_duration = rng.uniform(2000, 5000) # Visible for 2-5 seconds (ms)
+        self.expire_time = now + self.visible_duration
+        self.flipped = False # Draw the image mirrored horizontally
+
+class Bandit(Character):
+    __slots__ = ("cash_value", "rng", "shoot_delay", "next_shot_time")
+
+    def setup(self, x, y, now, rng, shoot_delay=(BANDIT_MIN_SHOOT_DELAY, BANDIT_MAX_SHOOT_DELAY)):
+        super().setup(x, y, CHARACTER_WIDTH, CHARACTER_HEIGHT, BROWN, now, rng)
+        self.cash_value = 100
+        self.rng = rng
+        self.shoot_delay = shoot_delay # (min, max) ms between shots
+        self.reset_shoot_timer(now)
+
+        # Face left if spawning on the right half
+        self.flipped = x > SCREEN_WIDTH / 2
+
+    def reset_shoot_timer(self, now):
+        self.next_shot_time = now + self.rng.randint(*self.shoot_delay)
+
+class Civilian(Character):
+    __slots__ = ("direction", "velocity")
+
+    def setup(self, now, rng):
+        self.direction = rng.choice([-1, 1]) # -1 for left, 1 for right
+        self.velocity = self.direction * CIVILIAN_SPEED # px per simulation step
+        spawn_y = rng.randint(SCREEN_HEIGHT // 2 + 10, SCREEN_HEIGHT - CHARACTER_HEIGHT - 10) # Spawn on the ground
+
+        if self.direction == 1: # Moving right
+            spawn_x = -CHARACTER_WIDTH # Start just off-screen left
+        else: # Moving left
+            spawn_x = SCREEN_WIDTH # Start just off-screen right
+
+        # Call super().setup *after* determining position
+        super().setup(spawn_x, spawn_y, CHARACTER_WIDTH, CHARACTER_HEIGHT, GRAY, now, rng)
+        # Civilians don't expire based on time, but on leaving screen
+        self.visible_duration = float('inf')
+        self.expire_time = float('inf')
+
+        # Face left if moving left
+        self.flipped = self.direction == -1
+
+class DeadBandit:
+    __slots__ = ("entity_id", "rect", "color", "death_time", "expire_time")
+
+    def __init__(self, *args):
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.setup(*args)
+
+    def setup(self, x, y, now):
+        self.rect.update(x, y, CHARACTER_WIDTH, CHARACTER_HEIGHT // 2) # Shorter when dead
+        self.color = DARK_RED
+        self.death_time = now
+        self.expire_time = now + DEAD_BANDIT_DESPAWN_TIME
+
+# --- Item Classes ---
+class HealthPack:
+    __slots__ = ("entity_id", "rect", "color", "spawn_time", "expire_time")
+
+    def __init__(self, *args):
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.setup(*args)
+
+    def setup(self, x, y, now):
+        # Center the pack where the bandit died
+        center_x = x + CHARACTER_WIDTH / 2
+        center_y = y + (CHARACTER_HEIGHT // 2) / 2
+        self.rect.update(center_x - HEALTH_PACK_SIZE // 2,
+                               center_y - HEALTH_PACK_SIZE // 2,
+                               HEALTH_PACK_SIZE, HEALTH_PACK_SIZE)
+        self.color = WHITE
+        self.spawn_time = now
+        self.expire_time = now + HEALTH_PACK_DESPAWN_TIME
+
+# --- Effects Classes ---
+class ShotEffect:
+    __slots__ = ("entity_id", "start_pos", "end_pos", "color", "creation_time", "expire_time")
+
+    def __init__(self, *args):
+        self.setup(*args)
+
+    def setup(self, start_pos, end_pos, color, now):
+        self.start_pos = start_pos
+        self.end_pos = end_pos
+        self.color = color
+        self.creation_time = now
+        self.expire_time = now + SHOT_LINE_DURATION
+
+# Click priority in the spatial index: pickups first, then bandits before civilians
+LAYER_HEALTH_PACK = 0
+LAYER_DEAD_BANDIT = 1
+LAYER_BANDIT = 2
+LAYER_CIVILIAN = 3
+
+# Difficulty settings a Simulation can override for itself, so balance.py
+# can compare several values in one process
+TUNABLE_SETTINGS = (
+    "KILLS_PER_LEVEL",
+    "SPAWN_RATE_DECREASE_PER_LEVEL",
+    "BANDIT_MIN_SHOOT_DELAY",
+    "BANDIT_MAX_SHOOT_DELAY",
+    "HEALTH_PACK_DROP_CHANCE",
+    "AMMO_PER_COLLECT",
+)
+
+class Tuning:
+    # The TUNABLE_SETTINGS in effect for one Simulation: the settings.py
+    # values, except for those passed in
+    __slots__ = TUNABLE_SETTINGS
+
+    def __init__(self, **overrides):
+        unknown = set(overrides) - set(TUNABLE_SETTINGS)
+        if unknown:
+            raise ValueError(f"Cannot tune {', '.join(sorted(unknown))}")
+        for name in TUNABLE_SETTINGS:
+            setattr(self, name, overrides.get(name, globals()[name]))
+
+    @property
+    def shoot_delay(self):
+        return (self.BANDIT_MIN_SHOOT_DELAY, self.BANDIT_MAX_SHOOT_DELAY)
+
+# --- Simulation ---
+class Simulation:
+    def __init__(self, seed=None, clock=None, profiler=None, tuning=None):
+        # tuning: {setting name: value} overriding some TUNABLE_SETTINGS
+        self.rng = random.Random(seed)
+        self.tuning = Tuning(**(tuning or {}))
+        self.clock = clock or GameClock()
+        self.profiler = profiler or FrameProfiler() # Disabled unless one is passed in
+        self.steps = 0 # step() calls so far, across resets
+        self.next_entity_id = 0 # Serial number for the next entity added, never reused
+        self.pool = EntityPool() # Kept across resets
+        self.bandits = self.civilians = self.dead_bandits = self.health_packs = []
+        self.player_shot_effects = self.bandit_shot_effects = []
+        self.reset()
+
+    def reset(self):
+        self.clock.resync()
+        self.state = PLAYING
+        self.game_over_reason = None
+        self.score = 0
+        self.ammo = STARTING_AMMO
+        self.player_health = MAX_PLAYER_HEALTH
+        # Whatever is still on screen goes back to the pool for the next round
+        for entities in (self.bandits, self.civilians, self.dead_bandits, self.health_packs,
+                         self.player_shot_effects, self.bandit_shot_effects):
+            for entity in entities:
+                self.pool.release(entity)
+        self.bandits = []
+        self.civilians = []
+        self.dead_bandits = []
+        self.health_packs = []
+        self.player_shot_effects = []
+        self.bandit_shot_effects = []
+        self.bandits_killed = 0
+        self.hit_index = SpatialGrid(SPATIAL_CELL_SIZE) # Everything that can be clicked
+        self.expiries = TimerQueue() # expire_time of everything that expires, with its list
+        self.shots = TimerQueue() # next_shot_time of each bandit
+        self.last_bandit_spawn_time = self.clock.now # Reset spawn timers
+        self.last_civilian_spawn_time = self.clock.now
+
+    @property
+    def level(self):
+        return self.bandits_killed // self.tuning.KILLS_PER_LEVEL
+
+    @property
+    def game_over(self):
+        return self.state == GAME_OVER
+
+    def add_entity(self, entities, entity, layer):
+        entity.entity_id = self.next_entity_id
+        self.next_entity_id += 1
+        entities.append(entity)
+        self.hit_index.insert(entity, layer)
+        if entity.expire_time != float('inf'): # Civilians leave by walking off screen
+            self.expiries.schedule(entity.expire_time, entity, entities)
+        if isinstance(entity, Bandit):
+            self.shots.schedule(entity.next_shot_time, entity)
+
+    def add_effect(self, effects, effect):
+        # Effects can't be clicked, so they only need their expiry timer
+        effect.entity_id = self.next_entity_id
+        self.next_entity_id += 1
+        effects.append(effect)
+        self.expiries.schedule(effect.expire_time, effect, effects)
+
+    def remove_entity(self, entities, entity):
+        # The entity goes back to the pool, so it must not be used afterwards
+        entities.remove(entity)
+        self.hit_index.remove(entity)
+        self.expiries.cancel(entity)
+        self.shots.cancel(entity)
+        self.pool.release(entity)
+
+    def end_game(self, reason):
+        self.state = GAME_OVER
+        self.game_over_reason = reason
+
+    def step(self, dt=None, inputs=()):
+        # Tick the clock (by dt milliseconds for a virtual clock) and advance
+        # the game. inputs is an iterable of left-click positions that
+        # happened since the previous step. Returns the list of events that
+        # happened, for the frontend to react to.
+        events = []
+        self.steps += 1
+        dt = self.clock.tick(dt)
+        if self.state != PLAYING:
+            return events
+
+        for pos in inputs:
+            self.handle_click(pos, events)
+            if self.state != PLAYING:
+                return events
+        self.profiler.mark("input")
+
+        self.update(dt, events)
+        return events
+
+    # --- Input ---
+    def handle_click(self, pos, events):
+        # One query finds what was clicked: health packs, then dead bandits,
+        # then bandits, then civilians, newest first within each
+        target = self.hit_index.topmost(pos)
+
+        # 1. Health Pack Collection First
+        if isinstance(target, HealthPack):
+            if self.player_health < MAX_TOTAL_HEALTH:
+                self.player_health += 1
+                logger.debug("Collected Health Pack! Health: %d", self.player_health)
+            else:
+                logger.debug("Already at max health!")
+            self.remove_entity(self.health_packs, target)
+            events.append("collect_health")
+            return
+
+        # 2. If no pack, Dead Bandit Ammo Collection
+        if isinstance(target, DeadBandit):
+            self.ammo += self.tuning.AMMO_PER_COLLECT
+            logger.debug("Collected Ammo! Ammo: %d", self.ammo)
+            self.remove_entity(self.dead_bandits, target)
+            events.append("collect_ammo")
+            return
+
+        # 3. If nothing collected, proceed with shooting logic
+        if self.ammo <= 0:
+            logger.debug("Click! Out of ammo.")
+            events.append("empty_click")
+            return
+
+        self.ammo -= 1
+        self.add_effect(self.player_shot_effects, self.pool.acquire(ShotEffect, PLAYER_POSITION, pos, PLAYER_SHOT_COLOR, self.clock.now))
+        events.append("shot")
+
+        if isinstance(target, Bandit):
+            self.kill_bandit(target)
+            events.append("bandit_hit")
+        elif isinstance(target, Civilian): # Only reached if no bandit was under the shot
+            logger.info("Hit a civilian! Game Over.")
+            self.end_game(GAME_OVER_CIVILIAN)
+            events.append("civilian_hit")
+
+    def kill_bandit(self, bandit):
+        self.score += bandit.cash_value
+        self.bandits_killed += 1
+        bandit_death_pos_x = bandit.rect.x
+        bandit_death_pos_y = bandit.rect.bottom - CHARACTER_HEIGHT // 2
+        self.remove_entity(self.bandits, bandit)
+        self.add_entity(self.dead_bandits, self.pool.acquire(DeadBandit, bandit_death_pos_x, bandit_death_pos_y, self.clock.now), LAYER_DEAD_BANDIT)
+
+        # Chance to drop health pack
+        if self.rng.random() < self.tuning.HEALTH_PACK_DROP_CHANCE:
+            self.add_entity(self.health_packs, self.pool.acquire(HealthPack, bandit_death_pos_x, bandit_death_pos_y, self.clock.now), LAYER_HEALTH_PACK)
+            logger.debug("Bandit dropped a health pack!")
+
+    # --- Game Logic ---
+    def update(self, dt, events):
+        now = self.clock.now
+        profiler = self.profiler
+
+        # --- Spawning Logic ---
+        total_characters = len(self.bandits) + len(self.civilians)
+
+        # Calculate current spawn rate
+        spawn_rate_reduction = self.level * self.tuning.SPAWN_RATE_DECREASE_PER_LEVEL
+        actual_bandit_spawn_rate_seconds = max(MIN_BANDIT_SPAWN_RATE, BANDIT_SPAWN_RATE - spawn_rate_reduction)
+        actual_bandit_spawn_rate_ms = actual_bandit_spawn_rate_seconds * 1000
+
+        # Spawn Bandits
+        if len(self.bandits) < MAX_BANDITS_ON_SCREEN and now - self.last_bandit_spawn_time > actual_bandit_spawn_rate_ms:
+            spawn_x = self.rng.randint(0, SCREEN_WIDTH - CHARACTER_WIDTH)
+            # Spawn near the middle vertically for a street feel
+            spawn_y = self.rng.randint(SCREEN_HEIGHT // 3, SCREEN_HEIGHT - CHARACTER_HEIGHT - 50)
+            self.add_entity(self.bandits, self.pool.acquire(Bandit, spawn_x, spawn_y, now, self.rng, self.tuning.shoot_delay), LAYER_BANDIT)
+            self.last_bandit_spawn_time = now
+
+        # Spawn Civilians
+        if total_characters < MAX_CHARACTERS_ON_SCREEN and now - self.last_civilian_spawn_time > CIVILIAN_SPAWN_RATE * 1000:
+            self.add_entity(self.civilians, self.pool.acquire(Civilian, now, self.rng), LAYER_CIVILIAN)
+            self.last_civilian_spawn_time = now
+        profiler.mark("spawning")
+
+        # --- Expiry (bandits leaving, dead bandits and health packs despawning, shot effects fading) ---
+        # Expired bandits must be gone before the shooting pass below
+        for entity, entities in self.expiries.pop_due(now, inclusive=False):
+            self.remove_entity(entities, entity)
+        # Civilians are removed when they go offscreen
+        # (they spawn just touching an edge, so past either edge means gone)
+        offscreen = [c for c in self.civilians if c.rect.left > SCREEN_WIDTH or c.rect.right < 0]
+        for civilian in offscreen:
+            self.remove_entity(self.civilians, civilian)
+        profiler.mark("expiry")
+
+        # --- Update Bandits (Shooting) ---
+        # Bandits that are due fire in spawn order, as they appear in self.bandits
+        shooters = [bandit for bandit, _ in self.shots.pop_due(now)]
+        shooters.sort(key=lambda bandit: bandit.spawn_time)
+        for bandit in shooters:
+            self.player_health -= 1
+            logger.debug("Ouch! Player health: %d", self.player_health)
+            self.add_effect(self.bandit_shot_effects, self.pool.acquire(ShotEffect, bandit.rect.center, PLAYER_POSITION, BANDIT_SHOT_COLOR, now))
+            events.append("player_hit")
+            bandit.reset_shoot_timer(now)
+            self.shots.schedule(bandit.next_shot_time, bandit)
+            if self.player_health <= 0:
+                logger.info("Player died! Game Over.")
+                self.end_game(GAME_OVER_SHOT)
+                break # Stop processing further bandit shots this frame
+        profiler.mark("bandit_updates")
+
+        # Check if ammo is zero and no way to get more (no dead bandits)
+        if self.state == PLAYING and self.ammo <= 0 and not self.dead_bandits and not self.bandits: # Also check bandits to prevent immediate loss if one is about to die
+            logger.info("Out of ammo and targets! Game Over.")
+            self.end_game(GAME_OVER_OUT_OF_AMMO)
+
+        # --- Update Civilian Positions ---
+        for civilian in self.civilians:
+            civilian.rect.x += civilian.velocity
+            self.hit_index.move(civilian)
+        profiler.mark("civilian_movement")
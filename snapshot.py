@@ -0,0 +1,252 @@
+import random
+import struct
+
+from settings import *
+from simulation import (Simulation, Bandit, Civilian, DeadBandit, HealthPack, ShotEffect,
+                        LAYER_BANDIT, LAYER_CIVILIAN, LAYER_DEAD_BANDIT, LAYER_HEALTH_PACK)
+
+# Binary game state snapshots (little-endian), for spectator streams, saves
+# and seeking.
+#   header: magic b"WSSN", format version (u8), flags (u8), simulation step
+#     (u32), base step (u32, the snapshot a DELTA applies to, else 0)
+#   scalars: game state (u8), game over reason (u8), cash, ammo, health,
+#     kills (i32)
+#   full snapshot: entity count (u16) + ENTITY records, effect count (u16) +
+#     EFFECT records
+#   delta: removed count (u16) + entity ids (u32), then changed or new
+#     entities and new effects as in a full snapshot
+#   RESUME (full snapshots only): what a Simulation needs to continue
+#     exactly where the snapshot was taken, see encode_resume()
+# Entities are matched across snapshots by entity_id, which the simulation
+# assigns when it adds them. Effects never change, so a delta only carries
+# new ones and removed ids.
+MAGIC = b"WSSN"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sBBII")
+SCALARS = struct.Struct("<BBiiii")
+COUNT = struct.Struct("<H")
+ENTITY_ID = struct.Struct("<I")
+ENTITY = struct.Struct("<IBhh") # id, kind (+FLIPPED), x, y
+EFFECT = struct.Struct("<IBhhhh") # id, kind, start x, y, end x, y
+RESUME = struct.Struct("<dddII") # clock now, last bandit spawn, last civilian spawn, steps, next entity id
+RNG_STATE = struct.Struct("<624IIBd") # Mersenne Twister words, index, has gauss_next, gauss_next
+TIMING = struct.Struct("<ddd") # spawn time, expire time, next shot time (bandits only)
+
+# Flags
+DELTA = 1
+RESUMABLE = 2
+
+# Entity kinds
+BANDIT = 0
+CIVILIAN = 1
+DEAD_BANDIT = 2
+HEALTH_PACK = 3
+PLAYER_SHOT = 4
+BANDIT_SHOT = 5
+FLIPPED = 0x80
+
+# Range of the i16 position fields. Anything outside it is far off screen,
+# so positions are clamped to it rather than failing to pack.
+COORD_MIN = -0x8000
+COORD_MAX = 0x7FFF
+
+REASON_CODES = {None: 0, GAME_OVER_SHOT: 1, GAME_OVER_CIVILIAN: 2, GAME_OVER_OUT_OF_AMMO: 3}
+REASONS = {code: reason for reason, code in REASON_CODES.items()}
+
+def entity_lists(sim):
+    return ((BANDIT, sim.bandits), (CIVILIAN, sim.civilians),
+            (DEAD_BANDIT, sim.dead_bandits), (HEALTH_PACK, sim.health_packs))
+
+def effect_lists(sim):
+    return ((PLAYER_SHOT, sim.player_shot_effects), (BANDIT_SHOT, sim.bandit_shot_effects))
+
+def clamp_coord(value):
+    return min(max(value, COORD_MIN), COORD_MAX)
+
+def pack_entities(sim):
+    # -> ({id: ENTITY record}, {id: EFFECT record}), in list order
+    entities = {}
+    for kind, entity_list in entity_lists(sim):
+        for entity in entity_list:
+            flags = FLIPPED if kind <= CIVILIAN and entity.flipped else 0
+            x, y = clamp_coord(entity.rect.x), clamp_coord(entity.rect.y)
+            entities[entity.entity_id] = ENTITY.pack(entity.entity_id, kind | flags, x, y)
+    effects = {}
+    for kind, effect_list in effect_lists(sim):
+        for effect in effect_list:
+            positions = [clamp_coord(value) for value in (*effect.start_pos, *effect.end_pos)]
+            effects[effect.entity_id] = EFFECT.pack(effect.entity_id, kind, *positions)
+    return entities, effects
+
+def pack_scalars(sim):
+    return SCALARS.pack(sim.state, REASON_CODES[sim.game_over_reason], sim.score, sim.ammo,
+                        sim.player_health, sim.bandits_killed)
+
+def pack_records(records):
+    return COUNT.pack(len(records)) + b"".join(records)
+
+def encode_resume(sim):
+    # Clock, spawn timers, RNG state and every entity's deadlines. Entity
+    # order is the same as in the snapshot's records.
+    version, words, gauss_next = sim.rng.getstate()
+    data = bytearray(RESUME.pack(sim.clock.now, sim.last_bandit_spawn_time, sim.last_civilian_spawn_time,
+                                 sim.steps, sim.next_entity_id))
+    data += RNG_STATE.pack(*words, gauss_next is not None, gauss_next or 0.0)
+    for kind, entity_list in entity_lists(sim):
+        for entity in entity_list:
+            start = entity.death_time if kind == DEAD_BANDIT else entity.spawn_time
+            next_shot = entity.next_shot_time if kind == BANDIT else 0.0
+            data += TIMING.pack(start, entity.expire_time, next_shot)
+    for kind, effect_list in effect_lists(sim):
+        for effect in effect_list:
+            data += TIMING.pack(effect.creation_time, effect.expire_time, 0.0)
+    return data
+
+class SnapshotEncoder:
+    # Encodes one stream of snapshots. encode() sends a delta against the
+    # previous snapshot unless a full one is asked for or there is nothing
+    # to diff against yet.
+    def __init__(self):
+        self.previous = None # (step, entities, effects) of the last snapshot
+
+    def encode(self, sim, full=False, resumable=False):
+        entities, effects = pack_entities(sim)
+        previous = self.previous
+        self.previous = (sim.steps, entities, effects)
+        if full or resumable or previous is None:
+            flags = RESUMABLE if resumable else 0
+            data = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, flags, sim.steps, 0))
+            data += pack_scalars(sim)
+            data += pack_records(list(entities.values()))
+            data += pack_records(list(effects.values()))
+            if resumable:
+                data += encode_resume(sim)
+            return bytes(data)
+
+        base_step, old_entities, old_effects = previous
+        removed = [ENTITY_ID.pack(entity_id) for entity_id in old_entities if entity_id not in entities]
+        removed += [ENTITY_ID.pack(effect_id) for effect_id in old_effects if effect_id not in effects]
+        changed = [record for entity_id, record in entities.items() if old_entities.get(entity_id) != record]
+        added = [record for effect_id, record in effects.items() if effect_id not in old_effects]
+        data = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, DELTA, sim.steps, base_step))
+        data += pack_scalars(sim)
+        data += pack_records(removed)
+        data += pack_records(changed)
+        data += pack_records(added)
+        return bytes(data)
+
+def read_records(data, offset, record):
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    return [record.unpack_from(data, offset + i * record.size) for i in range(count)], offset + count * record.size
+
+class SnapshotDecoder:
+    # Rebuilds the game state from a stream of snapshots: the scalars plus
+    # entities and effects as {id: unpacked record}, in list order.
+    def __init__(self):
+        self.step = None
+        self.state = None
+        self.game_over_reason = None
+        self.score = self.ammo = self.player_health = self.bandits_killed = 0
+        self.entities = {} # id -> (id, kind, x, y); kind includes FLIPPED
+        self.effects = {} # id -> (id, kind, start x, start y, end x, end y)
+
+    def decode(self, data):
+        # Applies one snapshot. Returns the offset where its RESUME section
+        # starts, or None if it has none.
+        magic, version, flags, step, base_step = HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Not a version {FORMAT_VERSION} snapshot")
+        if flags & DELTA and base_step != self.step:
+            raise ValueError(f"Delta for step {base_step}, but the decoder is at step {self.step}")
+        state, reason, self.score, self.ammo, self.player_health, self.bandits_killed = SCALARS.unpack_from(data, HEADER.size)
+        self.state = state
+        self.game_over_reason = REASONS[reason]
+        offset = HEADER.size + SCALARS.size
+
+        if flags & DELTA:
+            removed, offset = read_records(data, offset, ENTITY_ID)
+            for (entity_id,) in removed:
+                if self.entities.pop(entity_id, None) is None:
+                    self.effects.pop(entity_id, None)
+            changed, offset = read_records(data, offset, ENTITY)
+            for record in changed:
+                self.entities[record[0]] = record
+            added, offset = read_records(data, offset, EFFECT)
+            for record in added:
+                self.effects[record[0]] = record
+        else:
+            entities, offset = read_records(data, offset, ENTITY)
+            effects, offset = read_records(data, offset, EFFECT)
+            self.entities = {record[0]: record for record in entities}
+            self.effects = {record[0]: record for record in effects}
+        self.step = step
+        return offset if flags & RESUMABLE else None
+
+def restore_simulation(data, clock=None, tuning=None):
+    # Rebuilds a Simulation from a resumable snapshot. Given the same inputs
+    # (and tuning) from then on, it plays out exactly like the one that was
+    # saved.
+    decoder = SnapshotDecoder()
+    offset = decoder.decode(data)
+    if offset is None:
+        raise ValueError("Snapshot was not saved as resumable")
+    sim = Simulation(clock=clock, tuning=tuning)
+    now, last_bandit_spawn, last_civilian_spawn, steps, next_entity_id = RESUME.unpack_from(data, offset)
+    offset += RESUME.size
+    rng_state = RNG_STATE.unpack_from(data, offset)
+    offset += RNG_STATE.size
+    sim.clock.now = now
+    sim.steps = steps
+    sim.state = decoder.state
+    sim.game_over_reason = decoder.game_over_reason
+    sim.score = decoder.score
+    sim.ammo = decoder.ammo
+    sim.player_health = decoder.player_health
+    sim.bandits_killed = decoder.bandits_killed
+    sim.last_bandit_spawn_time = last_bandit_spawn
+    sim.last_civilian_spawn_time = last_civilian_spawn
+
+    scratch_rng = random.Random() # Entity setup() draws numbers; sim.rng is restored afterwards
+    for entity_id, kind, x, y in decoder.entities.values():
+        start, expire_time, next_shot_time = TIMING.unpack_from(data, offset)
+        offset += TIMING.size
+        flipped = bool(kind & FLIPPED)
+        kind &= ~FLIPPED
+        if kind == BANDIT:
+            entity = Bandit(x, y, start, scratch_rng, sim.tuning.shoot_delay)
+            entity.rng = sim.rng
+            entity.next_shot_time = next_shot_time
+            entities, layer = sim.bandits, LAYER_BANDIT
+        elif kind == CIVILIAN:
+            entity = Civilian(start, scratch_rng)
+            entity.direction = -1 if flipped else 1
+            entity.velocity = entity.direction * CIVILIAN_SPEED
+            entity.rect.topleft = (x, y)
+            entities, layer = sim.civilians, LAYER_CIVILIAN
+        elif kind == DEAD_BANDIT:
+            entity = DeadBandit(x, y, start)
+            entities, layer = sim.dead_bandits, LAYER_DEAD_BANDIT
+        else:
+            entity = HealthPack(x, y, start)
+            entity.rect.topleft = (x, y) # Records hold the rect, not the bandit position it was made from
+            entities, layer = sim.health_packs, LAYER_HEALTH_PACK
+        entity.expire_time = expire_time
+        if kind in (BANDIT, CIVILIAN):
+            entity.flipped = flipped
+            entity.visible_duration = expire_time - start
+        sim.add_entity(entities, entity, layer)
+        entity.entity_id = entity_id
+    for entity_id, kind, *positions in decoder.effects.values():
+        start, expire_time, _ = TIMING.unpack_from(data, offset)
+        offset += TIMING.size
+        effects, color = ((sim.player_shot_effects, PLAYER_SHOT_COLOR) if kind == PLAYER_SHOT
+                          else (sim.bandit_shot_effects, BANDIT_SHOT_COLOR))
+        effect = ShotEffect(tuple(positions[:2]), tuple(positions[2:]), color, start)
+        effect.expire_time = expire_time
+        sim.add_effect(effects, effect)
+        effect.entity_id = entity_id
+    sim.next_entity_id = next_entity_id
+    *words, index, has_gauss, gauss_next = rng_state
+    sim.rng.setstate((3, tuple(words) + (index,), gauss_next if has_gauss else None))
+    return sim
@@ -0,0 +1,71 @@
+class SpatialGrid:
+    # Uniform grid over entity rects for point queries. Each entity is
+    # registered with a layer (lower layers win) and an insertion sequence
+    # number, so topmost() can reproduce "newest first within a layer"
+    # ordering without scanning every entity.
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {} # (cell_x, cell_y) -> set of entities
+        self.entries = {} # entity -> [layer, sequence, cell range]
+        self.next_sequence = 0
+
+    def _cell_range(self, rect):
+        size = self.cell_size
+        return (rect.left // size, rect.top // size,
+                (rect.right - 1) // size, (rect.bottom - 1) // size)
+
+    def _link(self, entity, cell_range):
+        x0, y0, x1, y1 = cell_range
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self.cells.setdefault((cx, cy), set()).add(entity)
+
+    def _unlink(self, entity, cell_range):
+        x0, y0, x1, y1 = cell_range
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self.cells[(cx, cy)]
+                cell.discard(entity)
+                if not cell:
+                    del self.cells[(cx, cy)]
+
+    def insert(self, entity, layer):
+        cell_range = self._cell_range(entity.rect)
+        self.entries[entity] = [layer, self.next_sequence, cell_range]
+        self.next_sequence += 1
+        self._link(entity, cell_range)
+
+    def remove(self, entity):
+        entry = self.entries.pop(entity, None)
+        if entry is not None:
+            self._unlink(entity, entry[2])
+
+    def move(self, entity):
+        # Call after changing entity.rect; only touches the grid when the
+        # rect crosses into different cells
+        entry = self.entries[entity]
+        cell_range = self._cell_range(entity.rect)
+        if cell_range != entry[2]:
+            self._unlink(entity, entry[2])
+            self._link(entity, cell_range)
+            entry[2] = cell_range
+
+    def topmost(self, point):
+        # The entity under point in the lowest layer, newest first within a
+        # layer, or None
+        cell = self.cells.get((point[0] // self.cell_size, point[1] // self.cell_size))
+        if not cell:
+            return None
+        best = None
+        best_key = None
+        for entity in cell:
+            if entity.rect.collidepoint(point):
+                layer, sequence, _ = self.entries[entity]
+                key = (layer, -sequence)
+                if best_key is None or key < best_key:
+                    best, best_key = entity, key
+        return best
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
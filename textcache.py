@@ -0,0 +1,33 @@
+from collections import OrderedDict
+
+import pygame
+
+class TextCache:
+    # Rendered text surfaces keyed by (text, color, size). A label is only
+    # rasterized again when its text changes; the least recently used
+    # surfaces are dropped once max_entries is reached. Fonts are loaded
+    # once per size.
+    def __init__(self, max_entries=64, font_name=None):
+        self.max_entries = max_entries
+        self.font_name = font_name # None means pygame's default font
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+
+    def get_font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(self.font_name, size)
+            self.fonts[size] = font
+        return font
+
+    def render(self, text, color, size=36):
+        key = (text, color, size)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.get_font(size).render(text, True, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_entries:
+                self.surfaces.popitem(last=False) # Evict the least recently used
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
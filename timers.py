@@ -0,0 +1,41 @@
+import heapq
+
+class TimerQueue:
+    # Min-heap of entity deadlines. Each entity has at most one timer per
+    # queue; scheduling it again replaces the old one. Cancelled timers stay
+    # in the heap with their entity cleared and are dropped when they reach
+    # the top, so cancel() is O(1) and pop_due() only touches timers that
+    # are actually due.
+    def __init__(self):
+        self.heap = [] # [deadline, sequence, entity, payload]
+        self.timers = {} # entity -> its live heap entry
+        self.next_sequence = 0 # Breaks deadline ties in scheduling order
+
+    def __len__(self):
+        return len(self.timers)
+
+    def schedule(self, deadline, entity, payload=None):
+        self.cancel(entity)
+        entry = [deadline, self.next_sequence, entity, payload]
+        self.next_sequence += 1
+        self.timers[entity] = entry
+        heapq.heappush(self.heap, entry)
+
+    def cancel(self, entity):
+        entry = self.timers.pop(entity, None)
+        if entry is not None:
+            entry[2] = None
+
+    def pop_due(self, now, inclusive=True):
+        # Remove and return (entity, payload) for every live timer whose
+        # deadline is at or before now (strictly before unless inclusive),
+        # earliest first. Timers scheduled while the caller handles the
+        # result wait for the next call.
+        heap = self.heap
+        due = []
+        while heap and (heap[0][0] <= now if inclusive else heap[0][0] < now):
+            _, _, entity, payload = heapq.heappop(heap)
+            if entity is not None:
+                del self.timers[entity]
+                due.append((entity, payload))
+        return due